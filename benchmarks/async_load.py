@@ -0,0 +1,77 @@
+
+import sys
+import asyncio
+from time import perf_counter
+from os.path import dirname, join
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+
+from yargy import (  # noqa
+    Parser,
+    rule
+)
+from yargy.predicates import (  # noqa
+    gram,
+    type
+)
+from yargy.aio import AsyncExtractor  # noqa
+
+
+TEXT = (
+    'В 2017 году 3 февраля компания открыла 12 новых офисов '
+    'в Москве и Санкт-Петербурге, 1 марта — ещё 5.'
+)
+REQUESTS = 2000
+CONCURRENCY = [1, 8, 64, 256]
+
+
+def percentile(values, share):
+    values = sorted(values)
+    index = min(len(values) - 1, int(len(values) * share))
+    return values[index]
+
+
+async def client(extractor, queue, latencies):
+    while queue:
+        text = queue.pop()
+        start = perf_counter()
+        await extractor.findall(text)
+        latencies.append(perf_counter() - start)
+
+
+async def load(parser, concurrency, **kwargs):
+    queue = ['%d. %s' % (_, TEXT) for _ in range(REQUESTS)]
+    latencies = []
+    start = perf_counter()
+    async with AsyncExtractor(parser, **kwargs) as extractor:
+        await asyncio.gather(*[
+            client(extractor, queue, latencies)
+            for _ in range(concurrency)
+        ])
+    duration = perf_counter() - start
+    return duration, latencies
+
+
+def main():
+    parser = Parser(rule(type('INT'), gram('ADJF').optional(), gram('NOUN')))
+    print('{count} requests'.format(count=REQUESTS))
+    for batch_size in [1, 32]:
+        for concurrency in CONCURRENCY:
+            duration, latencies = asyncio.run(load(
+                parser, concurrency,
+                batch_size=batch_size
+            ))
+            print(
+                'batch {batch:<3} clients {clients:<4} '
+                '{rate:7.0f} req/s  p50 {p50:6.1f}ms  p99 {p99:6.1f}ms'.format(
+                    batch=batch_size,
+                    clients=concurrency,
+                    rate=REQUESTS / duration,
+                    p50=percentile(latencies, 0.5) * 1000,
+                    p99=percentile(latencies, 0.99) * 1000
+                )
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+
+import sys
+from time import perf_counter
+from os.path import dirname, join
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+
+from yargy import (  # noqa
+    Parser,
+    rule,
+    or_
+)
+from yargy.predicates import (  # noqa
+    eq,
+    gram,
+    type,
+    is_capitalized
+)
+from yargy.pipelines import morph_pipeline  # noqa
+
+
+TEXT = (
+    'В 2017 году 3 февраля компания открыла 12 новых офисов '
+    'в Москве и Санкт-Петербурге, 1 марта — ещё 5. Генеральный директор '
+    'Иван Петров сообщил, что к 2020 году их будет 40.\n'
+) * 100
+REPEAT = 5
+
+
+def grammars():
+    INT = type('INT')
+    MONTH = morph_pipeline(['январь', 'февраль', 'март'])
+    DATE = rule(
+        INT,
+        MONTH,
+        rule(INT, eq('года').optional()).optional()
+    ).named('DATE')
+    PERSON = rule(
+        gram('ADJF').optional(),
+        gram('NOUN').optional(),
+        gram('Name'),
+        gram('Surn').optional()
+    ).named('PERSON')
+    YEAR = rule(
+        eq('к').optional(),
+        INT,
+        eq('году')
+    ).named('YEAR')
+    COUNT = rule(INT, gram('ADJF').repeatable(max=3), gram('NOUN'))
+    return [
+        ('date', DATE),
+        ('person', PERSON),
+        ('year', YEAR),
+        ('count', COUNT),
+        ('or', or_(DATE, PERSON, YEAR)),
+    ]
+
+
+def best(function):
+    durations = []
+    for _ in range(REPEAT):
+        start = perf_counter()
+        function()
+        durations.append(perf_counter() - start)
+    return min(durations)
+
+
+def main():
+    for name, item in grammars():
+        chart = Parser(item)
+        automaton = Parser(item, automaton=True)
+        assert automaton.automaton, name
+        expected = [_.span for _ in chart.findall(TEXT)]
+        assert [_.span for _ in automaton.findall(TEXT)] == expected
+
+        before = best(lambda: list(chart.findall(TEXT)))
+        after = best(lambda: list(automaton.findall(TEXT)))
+        print('{name:<8} chart {before:.3f}s  automaton {after:.3f}s  '
+              'x{ratio:.1f}  {count} matches'.format(
+                  name=name,
+                  before=before,
+                  after=after,
+                  ratio=before / after,
+                  count=len(expected)
+              ))
+
+
+if __name__ == '__main__':
+    main()
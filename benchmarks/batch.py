@@ -0,0 +1,57 @@
+
+import sys
+import multiprocessing
+from time import perf_counter
+from os.path import dirname, join
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+
+from yargy import (  # noqa
+    Parser,
+    rule
+)
+from yargy.predicates import (  # noqa
+    gram,
+    type
+)
+from yargy.pipelines import morph_pipeline  # noqa
+from yargy.batch import extract  # noqa
+
+
+TEXT = (
+    'В 2017 году 3 февраля компания открыла 12 новых офисов '
+    'в Москве и Санкт-Петербурге, 1 марта — ещё 5. '
+)
+COUNT = 2000
+CHUNKSIZE = 50
+
+
+def grammar():
+    MONTH = morph_pipeline(['январь', 'февраль', 'март'])
+    return rule(
+        type('INT'),
+        MONTH.optional(),
+        gram('ADJF').optional(),
+        gram('NOUN')
+    )
+
+
+def main():
+    texts = ['%d. %s' % (index, TEXT) for index in range(COUNT)]
+    cores = multiprocessing.cpu_count()
+    print('{count} texts, {cores} cores'.format(count=COUNT, cores=cores))
+    for workers in range(1, cores + 1):
+        parser = Parser(grammar())
+        start = perf_counter()
+        for _ in extract(parser, texts, workers=workers, chunksize=CHUNKSIZE):
+            pass
+        duration = perf_counter() - start
+        print('workers {workers:<3} {duration:.3f}s {rate:.0f} texts/s'.format(
+            workers=workers,
+            duration=duration,
+            rate=COUNT / duration
+        ))
+
+
+if __name__ == '__main__':
+    main()
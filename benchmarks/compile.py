@@ -0,0 +1,59 @@
+
+import sys
+from time import perf_counter
+from os.path import dirname, join
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+
+from yargy import (  # noqa
+    rule,
+    or_
+)
+from yargy.predicates import (  # noqa
+    eq,
+    type
+)
+
+
+SIZE = 10000
+GROUP = 100
+
+
+def generate(size=SIZE):
+    # Groups of named rules with optional, repeatable and shared parts,
+    # roughly what large gazetteer-like grammars look like
+    INT = type('INT')
+    SHARED = rule(eq('-').optional(), INT).named('SHARED')
+    groups = []
+    for start in range(0, size, GROUP):
+        items = []
+        for index in range(start, start + GROUP):
+            word = 'w%d' % index
+            items.append(rule(
+                eq(word),
+                eq('x').optional(),
+                SHARED.repeatable(max=2)
+            ).named(word.upper()))
+        groups.append(or_(*items).named('G%d' % start))
+    return or_(*groups).named('ROOT')
+
+
+def measure(name, function):
+    start = perf_counter()
+    result = function()
+    print('{name:<12} {duration:.3f}s'.format(
+        name=name,
+        duration=perf_counter() - start
+    ))
+    return result
+
+
+def main():
+    root = measure('generate', generate)
+    normalized = measure('normalized', lambda: root.normalized)
+    bnf = measure('as_bnf', lambda: normalized.as_bnf)
+    print('{count} bnf rules'.format(count=len(bnf.rules)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+
+import sys
+from time import perf_counter
+from os.path import dirname, join
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+
+from yargy import (  # noqa
+    Parser,
+    rule,
+    or_
+)
+from yargy.predicates import (  # noqa
+    eq,
+    gram,
+    type
+)
+from yargy.relations import gnc_relation  # noqa
+
+
+TEXT = (
+    'В 2017 году 3 февраля компания открыла 12 новых офисов '
+    'в Москве и Санкт-Петербурге, 1 марта — ещё 5. Генеральный директор '
+    'Иван Петров сообщил, что к 2020 году их будет 40.\n'
+) * 50
+REPEAT = 5
+
+
+def grammar(relations):
+    # count and contains skip trees validation if no relations
+    adjf, noun = gram('ADJF'), gram('NOUN')
+    if relations:
+        gnc = gnc_relation()
+        adjf, noun = adjf.match(gnc), noun.match(gnc)
+    return or_(
+        rule(adjf.repeatable(), noun),
+        rule(type('INT'), eq('году'))
+    )
+
+
+def best(function):
+    durations = []
+    for _ in range(REPEAT):
+        start = perf_counter()
+        function()
+        durations.append(perf_counter() - start)
+    return min(durations)
+
+
+def main():
+    for relations in [False, True]:
+        parser = Parser(grammar(relations))
+        parser.findall(TEXT)  # warm morph cache
+        print('relations' if relations else 'no relations')
+        for name, function in [
+                ('findall', lambda: len(list(parser.findall(TEXT)))),
+                ('count', lambda: parser.count(TEXT)),
+                ('contains', lambda: parser.contains(TEXT)),
+        ]:
+            print('  {name:8} {time:.4f}s  {result}'.format(
+                name=name,
+                time=best(function),
+                result=function()
+            ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+
+import sys
+from time import perf_counter
+from os.path import dirname, join
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+
+from yargy import (  # noqa
+    Parser,
+    rule,
+    or_
+)
+from yargy.predicates import (  # noqa
+    eq,
+    gram,
+    type
+)
+from yargy.deadline import Deadline  # noqa
+
+
+TEXT = (
+    'В 2017 году 3 февраля компания открыла 12 новых офисов '
+    'в Москве и Санкт-Петербурге, 1 марта — ещё 5. Генеральный директор '
+    'Иван Петров сообщил, что к 2020 году их будет 40.\n'
+) * 50
+REPEAT = 10
+
+
+def best(function):
+    durations = []
+    for _ in range(REPEAT):
+        start = perf_counter()
+        function()
+        durations.append(perf_counter() - start)
+    return min(durations)
+
+
+def main():
+    parser = Parser(or_(
+        rule(gram('ADJF').repeatable(), gram('NOUN')),
+        rule(type('INT'), eq('году'))
+    ))
+    parser.findall(TEXT)  # warm morph cache
+    for name, function in [
+            ('no deadline', lambda: list(parser.findall(TEXT))),
+            ('deadline', lambda: list(parser.findall(
+                TEXT,
+                deadline=Deadline(timeout=60)
+            ))),
+    ]:
+        print('{name:12} {time:.4f}s'.format(
+            name=name,
+            time=best(function)
+        ))
+
+
+if __name__ == '__main__':
+    main()
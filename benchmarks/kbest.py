@@ -0,0 +1,58 @@
+
+import sys
+from time import perf_counter
+from os.path import dirname, join
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+
+from yargy import (  # noqa
+    Parser,
+    rule,
+    or_,
+    forward
+)
+from yargy.predicates import (  # noqa
+    eq,
+    type
+)
+from yargy.parser import prepare_trees  # noqa
+
+
+# catalan number of trees for the whole text
+A = forward()
+A.define(or_(
+    rule(type('INT')),
+    rule(A, eq('+'), A)
+))
+TEXT = ' + '.join(str(_) for _ in range(9))
+REPEAT = 5
+
+
+def best(function):
+    durations = []
+    for _ in range(REPEAT):
+        start = perf_counter()
+        function()
+        durations.append(perf_counter() - start)
+    return min(durations)
+
+
+def main():
+    parser = Parser(A)
+    chart = parser.chart(TEXT)
+    trees = list(prepare_trees(parser.chart_matches(chart, all=False)))
+    print('trees', len(trees))
+    for name, function in [
+            ('sorted', lambda: sorted(trees)[0]),
+            ('match', lambda: parser.chart_match(chart)),
+            ('extract k=5', lambda: list(parser.chart_extract(chart, k=5))),
+            ('findall', lambda: list(parser.chart_findall(chart))),
+    ]:
+        print('  {name:12} {time:.4f}s'.format(
+            name=name,
+            time=best(function)
+        ))
+
+
+if __name__ == '__main__':
+    main()
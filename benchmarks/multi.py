@@ -0,0 +1,67 @@
+
+import sys
+from time import perf_counter
+from os.path import dirname, join
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+
+from yargy import (  # noqa
+    Parser,
+    MultiParser,
+    rule
+)
+from yargy.predicates import (  # noqa
+    eq,
+    gram,
+    type
+)
+from yargy.pipelines import morph_pipeline  # noqa
+
+
+TEXT = (
+    'В 2017 году 3 февраля компания открыла 12 новых офисов '
+    'в Москве и Санкт-Петербурге, 1 марта — ещё 5. '
+) * 20
+REPEAT = 5
+
+
+def grammars():
+    INT = type('INT')
+    MONTH = morph_pipeline(['январь', 'февраль', 'март', 'апрель'])
+    CITY = morph_pipeline(['москва', 'санкт-петербург', 'казань'])
+    items = []
+    for index in range(10):
+        items.append(rule(INT, MONTH).named('DATE%d' % index))
+        items.append(rule(eq('в'), CITY).named('CITY%d' % index))
+        items.append(rule(INT, gram('ADJF').optional(), gram('NOUN')))
+        items.append(rule(eq('году'), gram('NOUN').optional()))
+    return items
+
+
+def best(function):
+    durations = []
+    for _ in range(REPEAT):
+        start = perf_counter()
+        function()
+        durations.append(perf_counter() - start)
+    return min(durations)
+
+
+def main():
+    rules = grammars()
+    parsers = [Parser(_) for _ in rules]
+    multi = MultiParser(rules)
+
+    def separate():
+        for parser in parsers:
+            list(parser.findall(TEXT))
+
+    print('{count} grammars'.format(count=len(rules)))
+    print('parsers      {time:.3f}s'.format(time=best(separate)))
+    print('multi        {time:.3f}s'.format(
+        time=best(lambda: multi.findall(TEXT))
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+
+import sys
+from time import perf_counter
+from os.path import dirname, join
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+
+from yargy import (  # noqa
+    Parser,
+    rule,
+    or_
+)
+from yargy.predicates import (  # noqa
+    eq,
+    gram,
+    type,
+    is_capitalized
+)
+
+
+TEXT = (
+    'В 2017 году 3 февраля компания открыла 12 новых офисов '
+    'в Москве и Санкт-Петербурге, 1 марта — ещё 5. Генеральный директор '
+    'Иван Петров сообщил, что к 2020 году их будет 40.\n'
+) * 50
+REPEAT = 5
+
+
+def deep(depth=8, width=4):
+    # Every level starts with next level, predicting root predicts
+    # depth * width rules through leading nonterminals
+    INT = type('INT')
+    level = or_(
+        rule(INT, eq('году')),
+        rule(gram('Name'), gram('Surn')),
+    )
+    for index in range(depth):
+        level = or_(*[
+            rule(level, gram('NOUN').optional())
+            if item == 0
+            else rule(level, eq('w%d_%d' % (index, item)))
+            for item in range(width)
+        ])
+    return level
+
+
+def best(function):
+    durations = []
+    for _ in range(REPEAT):
+        start = perf_counter()
+        function()
+        durations.append(perf_counter() - start)
+    return min(durations)
+
+
+def main():
+    parser = Parser(deep())
+    states = sum(len(_.states) for _ in parser.chart(TEXT).columns)
+    count = len(list(parser.findall(TEXT)))
+    print('chart  {time:.3f}s  {states} states  {count} matches'.format(
+        time=best(lambda: parser.chart(TEXT)),
+        states=states,
+        count=count
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+
+import sys
+from time import perf_counter
+from os.path import dirname, join
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+
+from yargy.tokenizer import (  # noqa
+    Tokenizer,
+    MorphTokenizer
+)
+from yargy.predicates import (  # noqa
+    gte,
+    caseless
+)
+
+
+TEXT = (
+    'Управляющий директор Иван Ульянов 12 марта 2019 года '
+    'подписал договор № 345 на сумму 1 500 000 руб. '
+    'с ООО «Ромашка», адрес: г. Москва, ул. Ленина, д. 7.\n'
+)
+REPEAT = 2000
+TRIES = 7
+
+
+def measure(name, function):
+    # best of several runs, timings on shared machines are noisy
+    durations = []
+    for _ in range(TRIES):
+        start = perf_counter()
+        count = function()
+        durations.append(perf_counter() - start)
+    duration = min(durations)
+    print('{name:<24} {count:>8} in {duration:.3f}s, {speed:>10,.0f}/s'.format(
+        name=name,
+        count=count,
+        duration=duration,
+        speed=count / duration
+    ))
+
+
+def main():
+    text = TEXT * REPEAT
+    tokenizer = Tokenizer()
+    morph = MorphTokenizer()
+    list(morph(TEXT))  # warm morph cache
+
+    tokens = list(tokenizer(text))
+    measure('tokenizer', lambda: sum(1 for _ in tokenizer(text)))
+    measure('morph tokenizer', lambda: sum(1 for _ in morph(text)))
+
+    number = gte(100)
+    word = caseless('москва')
+
+    def predicates():
+        for _ in range(10):
+            for token in tokens:
+                number(token)
+                word(token)
+        return len(tokens) * 10
+
+    measure('predicates x2', predicates)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+
+import asyncio
+
+import pytest
+
+from yargy import (
+    Parser,
+    rule
+)
+from yargy.predicates import (
+    gram,
+    type
+)
+from yargy.interpretation import fact
+from yargy.aio import AsyncExtractor
+from yargy.sink import match_tuple
+
+
+TEXTS = [
+    '%d февраля, %d мая' % (index, index + 1)
+    for index in range(50)
+]
+
+
+def spans(matches):
+    return [_.span for _ in matches]
+
+
+def test_async_extractor():
+    parser = Parser(rule(type('INT'), gram('NOUN')))
+    calls = []
+
+    async def run():
+        async with AsyncExtractor(parser, batch_size=8) as extractor:
+            process = extractor.process
+
+            def counted(items):
+                calls.append(len(items))
+                return process(items)
+
+            extractor.process = counted
+            return await asyncio.gather(*[
+                extractor.findall(_)
+                for _ in TEXTS
+            ])
+
+    results = asyncio.run(run())
+    assert [spans(_) for _ in results] == [
+        spans(parser.findall(_))
+        for _ in TEXTS
+    ]
+    assert sum(calls) == len(TEXTS)
+    assert max(calls) == 8
+
+
+def test_async_deadline():
+    parser = Parser(rule(type('INT'), gram('NOUN')))
+
+    async def run():
+        async with AsyncExtractor(parser, timeout=0) as extractor:
+            await extractor.findall(TEXTS[0])
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(run())
+
+    # returned on time, facts are read after timeout
+    Item = fact('Item', ['noun'])
+    parser = Parser(
+        rule(type('INT'), gram('NOUN').interpretation(Item.noun))
+        .interpretation(Item)
+    )
+
+    async def late():
+        async with AsyncExtractor(parser, timeout=0.2) as extractor:
+            matches = await extractor.findall(TEXTS[1])
+            await asyncio.sleep(0.3)
+            return [_.fact for _ in matches]
+
+    assert asyncio.run(late()) == [
+        Item(noun='февраля'),
+        Item(noun='мая')
+    ]
+
+
+def test_async_processes():
+    parser = Parser(rule(type('INT'), gram('NOUN')))
+
+    async def run():
+        extractor = AsyncExtractor.processes(parser, workers=2)
+        async with extractor:
+            return await asyncio.gather(*[
+                extractor.findall(_)
+                for _ in TEXTS[:5]
+            ])
+
+    results = asyncio.run(run())
+    assert results == [
+        [match_tuple(_) for _ in parser.findall(text)]
+        for text in TEXTS[:5]
+    ]
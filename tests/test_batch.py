@@ -0,0 +1,34 @@
+
+from yargy import (
+    Parser,
+    rule
+)
+from yargy.predicates import (
+    gram,
+    type
+)
+from yargy.batch import extract
+from yargy.sink import match_tuple
+
+
+TEXTS = [
+    '%d февраля, %d мая' % (index, index + 1)
+    for index in range(30)
+]
+
+
+def test_extract():
+    parser = Parser(rule(type('INT'), gram('NOUN')))
+    expected = [
+        [match_tuple(_) for _ in parser.findall(text)]
+        for text in TEXTS
+    ]
+    for workers in [1, 2]:
+        results = list(extract(parser, TEXTS, workers=workers, chunksize=4))
+        assert results == expected
+
+    results = extract(
+        parser, TEXTS, workers=2, chunksize=4,
+        prepare=lambda matches: len(list(matches))
+    )
+    assert list(results) == [2] * len(TEXTS)
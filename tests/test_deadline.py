@@ -0,0 +1,145 @@
+
+import pytest
+
+from yargy import (
+    Parser,
+    MultiParser,
+    rule
+)
+from yargy.predicates import type
+from yargy.interpretation import fact
+from yargy.tokenizer import Tokenizer
+from yargy.deadline import (
+    Deadline,
+    DeadlineExceeded,
+    check_tokens
+)
+
+
+INT = type('INT')
+TEXT = ' '.join(str(_) for _ in range(100))
+
+
+def test_deadline():
+    deadline = Deadline(timeout=60)
+    assert not deadline.expired
+    assert not deadline.check()
+    deadline.cancel()
+    assert deadline.expired
+    with pytest.raises(DeadlineExceeded):
+        deadline.check()
+
+    deadline = Deadline(timeout=-1, partial=True)
+    assert deadline.check()
+    assert isinstance(DeadlineExceeded(), TimeoutError)
+
+
+def test_check_tokens():
+    tokenizer = Tokenizer()
+    deadline = Deadline(timeout=60, partial=True)
+    tokens = []
+    for token in check_tokens(tokenizer(TEXT), deadline, step=10):
+        tokens.append(token)
+        if len(tokens) == 15:
+            deadline.cancel()
+    assert len(tokens) == 20
+
+    deadline = Deadline(partial=True)
+    deadline.cancel()
+    assert list(check_tokens(tokenizer(TEXT), deadline)) == []
+
+
+def test_parser():
+    parser = Parser(rule(INT, INT), tokenizer=Tokenizer())
+    matches = list(parser.findall(TEXT, deadline=Deadline(timeout=60)))
+    assert len(matches) == 50
+
+    for method in [
+            parser.findall,
+            parser.match,
+            parser.count,
+            parser.contains
+    ]:
+        with pytest.raises(DeadlineExceeded):
+            method(TEXT, deadline=Deadline(timeout=-1))
+
+    # tokens are not checked, chart is
+    tokens = list(parser.tokenize(TEXT))
+    with pytest.raises(DeadlineExceeded):
+        parser.findall_tokens(tokens, deadline=Deadline(timeout=-1))
+
+    deadline = Deadline(partial=True)
+    deadline.cancel()
+    assert list(parser.findall(TEXT, deadline=deadline)) == []
+
+
+def test_partial_chart():
+    from yargy.parser import Chart
+
+    parser = MultiParser([rule(INT, INT), rule(INT)], tokenizer=Tokenizer())
+    tokens = list(parser.tokenize(TEXT))
+
+    deadline = Deadline(partial=True)
+    chart = parser.build_chart(tokens, TEXT, deadline=deadline)
+    assert not chart.expired
+    deadline.cancel()
+    chart = parser.build_chart(tokens, TEXT, deadline=deadline)
+    assert chart.expired
+    assert not any(_.states for _ in chart.columns)
+
+    # cancelled while chart is built, checked every 8 columns
+    deadline = Deadline(partial=True)
+    chart = Chart(tokens, TEXT, deadline)
+    for column in parser.iter_chart(chart):
+        if column.index == 30:
+            deadline.cancel()
+    assert chart.expired
+    assert chart.columns[31].states
+    assert not chart.columns[32].states
+    pairs, items = parser.chart_findall(chart)
+    assert len(pairs) == 15
+    assert len(items) == 31
+
+
+def test_fact():
+    Item = fact('Item', ['value'])
+    parser = Parser(
+        rule(INT.interpretation(Item.value)).interpretation(Item),
+        tokenizer=Tokenizer()
+    )
+    deadline = Deadline(timeout=60)
+    match = parser.match('1', deadline=deadline)
+    assert match.fact == Item(value='1')
+
+    # checked while query runs
+    deadline = Deadline(timeout=60)
+    matches = parser.findall('1 2', deadline=deadline)
+    assert next(matches).fact == Item(value='1')
+    deadline.cancel()
+    with pytest.raises(DeadlineExceeded):
+        next(matches).fact
+
+    # matches returned on time are interpreted after deadline
+    for method in [parser.findall, parser.extract]:
+        deadline = Deadline(timeout=60)
+        matches = list(method('1 2', deadline=deadline))
+        deadline.cancel()
+        assert [_.fact for _ in matches] == [Item(value='1'), Item(value='2')]
+    deadline = Deadline(timeout=60)
+    match = parser.find('1', deadline=deadline)
+    deadline.cancel()
+    assert match.fact == Item(value='1')
+
+    parser = MultiParser(
+        [rule(INT.interpretation(Item.value)).interpretation(Item)],
+        tokenizer=Tokenizer()
+    )
+    deadline = Deadline(timeout=60)
+    results = [
+        parser.findall('1', deadline=deadline),
+        parser.extract('1', deadline=deadline),
+        parser.match('1', deadline=deadline)
+    ]
+    deadline.cancel()
+    [[a]], [[b]], [c] = results
+    assert a.fact == b.fact == c.fact == Item(value='1')
@@ -4,10 +4,11 @@ from yargy import (
     rule,
     Parser
 )
-from yargy.predicates import eq
+from yargy.predicates import eq, caseless
 from yargy.interpretation import (
     fact,
     attribute,
+    InflectedNormalizer,
 
     normalized,
     inflected,
@@ -176,6 +177,60 @@ def test_inflected():
     assert match.fact == 'московская'
 
 
+def test_inflected_cache():
+    from yargy.interpretation.normalizer import NormalizerCache
+
+    cache = NormalizerCache()
+    RULE = rule(
+        caseless('московским')
+    ).interpretation(
+        InflectedNormalizer({'nomn', 'femn'}, cache=cache)
+    )
+    parser = Parser(RULE)
+    for _ in range(3):
+        match = parser.match('московским')
+        assert match.fact == 'московская'
+
+    assert cache.forms.info.misses == 1
+    assert cache.chains.info.misses == 1
+    assert cache.chains.info.hits == 2
+    assert cache.chains.hit_rate == 2 / 3
+
+    match = parser.match('Московским')
+    assert match.fact == 'московская'
+    assert cache.chains.info.hits == 3
+
+
+def test_cache_threads():
+    import sys
+    import pickle
+    from concurrent.futures import ThreadPoolExecutor
+    from yargy.cache import Cache
+
+    # shared by threads, keys are evicted by other threads
+    cache = Cache(max_size=8)
+
+    def run(offset):
+        for index in range(20000):
+            key = (index + offset) % 16
+            if cache.get(key) is None:
+                cache.set(key, key)
+
+    # switch threads often, so race shows up
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(run, range(8)))
+    finally:
+        sys.setswitchinterval(interval)
+    assert len(cache) == 8
+    assert cache.info.hits + cache.info.misses == 8 * 20000
+
+    cache = pickle.loads(pickle.dumps(cache))
+    assert len(cache) == 8
+
+
 def test_const():
     RULE = rule(
         'a'
@@ -413,3 +468,27 @@ def test_pipeline_key():
     match = parser.match('заводе')
     value = match.fact
     assert value == 'завод'
+
+
+def test_text():
+    from yargy.interpretation.interpretator import Chain
+
+    RULE = rule('a', 'b', 'c')
+    parser = Parser(RULE)
+    text = 'x a   b\tc'
+    match = parser.find(text)
+    assert match.text == 'a   b\tc'
+    assert match.tokens[0].value == 'a'
+
+    chain = Chain(match.tokens, None, text)
+    assert chain.normalized == 'a b c'
+    assert chain.text == 'a   b\tc'
+    assert chain[1:].text == 'b\tc'
+    assert list(chain[1:].spans) == [(6, 9)]
+    assert len(chain[:1]) == 1
+
+    empty = chain[3:]
+    assert len(empty) == 0
+    assert empty.text == ''
+    assert empty.span is None
+    assert list(empty.spans) == []
@@ -0,0 +1,70 @@
+
+import json
+from io import StringIO
+
+from yargy.__main__ import main
+
+
+GRAMMAR = """
+from yargy import rule
+from yargy.predicates import type, gram
+from yargy.interpretation import fact
+
+Date = fact('Date', ['day', 'month'])
+DATE = rule(
+    type('INT').interpretation(Date.day),
+    gram('NOUN').interpretation(Date.month.normalized())
+).interpretation(Date)
+"""
+
+
+def read_jsonl(path):
+    with open(path, encoding='utf8') as file:
+        return [json.loads(_) for _ in file]
+
+
+def test_main(tmpdir, monkeypatch):
+    tmpdir.join('grammar_main.py').write(GRAMMAR)
+    monkeypatch.syspath_prepend(str(tmpdir))
+
+    docs = tmpdir.mkdir('docs')
+    docs.join('a.txt').write_text('3 февраля', 'utf8')
+    docs.join('b.jsonl').write_text(
+        '{"id": 1, "text": "1 мая и 2 мая"}\n'
+        '{"id": 2, "text": "нет"}\n',
+        'utf8'
+    )
+
+    stdout = StringIO()
+    main(['grammar_main:DATE', str(docs)], stdout=stdout)
+    lines = [json.loads(_) for _ in stdout.getvalue().splitlines()]
+    assert lines[0] == {
+        'id': str(docs.join('a.txt')),
+        'matches': [{
+            'span': [0, 9],
+            'rule': 'Date',
+            'fact': {'day': '3', 'month': 'февраль'}
+        }]
+    }
+    assert [_['id'] for _ in lines[1:]] == [1, 2]
+    assert len(lines[1]['matches']) == 2
+    assert lines[2]['matches'] == []
+
+    # interrupted run, last line is cut
+    output = tmpdir.join('output.jsonl')
+    output.write_text(
+        '{"id": 1, "matches": []}\n{"id": 2, "mat',
+        'utf8'
+    )
+    stdin = StringIO(
+        '{"id": 1, "text": "1 мая"}\n'
+        '{"id": 2, "text": "2 мая"}\n'
+    )
+    stderr = StringIO()
+    main(
+        ['grammar_main:DATE', '-o', str(output), '--resume', '-p', '-w', '2'],
+        stdin=stdin,
+        stderr=stderr
+    )
+    assert [_['id'] for _ in read_jsonl(str(output))] == [1, 2]
+    assert '1 docs, 1 skipped' in stderr.getvalue()
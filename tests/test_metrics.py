@@ -0,0 +1,152 @@
+
+import json
+import pickle
+
+import pytest
+
+from yargy import (
+    Parser,
+    MultiParser,
+    rule,
+    or_,
+    forward
+)
+from yargy.predicates import (
+    gram,
+    type
+)
+from yargy.interpretation import fact
+from yargy.interpretation import normalizer
+from yargy.parser import (
+    Limits,
+    ChartLimitError
+)
+from yargy.deadline import (
+    Deadline,
+    DeadlineExceeded
+)
+from yargy.metrics import (
+    Registry,
+    Histogram
+)
+
+
+INT = type('INT')
+
+
+def test_histogram():
+    histogram = Histogram('size', 'Size', [1, 10])
+    for value in [0, 1, 5, 100]:
+        histogram.observe(value)
+    assert list(histogram.prometheus) == [
+        '# HELP size Size',
+        '# TYPE size histogram',
+        'size_bucket{le="1"} 2',
+        'size_bucket{le="10"} 3',
+        'size_bucket{le="+Inf"} 4',
+        'size_sum 106',
+        'size_count 4'
+    ]
+    assert histogram.as_json['buckets'][-1] == ['+Inf', 4]
+
+
+def test_registry():
+    registry = Registry()
+    counter = registry.counter('items_total', 'Items')
+    assert registry.counter('items_total', 'Items') is counter
+    counter.inc(2)
+    with pytest.raises(ValueError):
+        registry.histogram('items_total', 'Items', [1])
+    registry.gauge('size', 'Size', lambda: 3)
+    assert registry.as_json == {'items_total': 2, 'size': 3}
+    assert registry.as_prometheus.splitlines() == [
+        '# HELP items_total Items',
+        '# TYPE items_total counter',
+        'items_total 2',
+        '# HELP size Size',
+        '# TYPE size gauge',
+        'size 3'
+    ]
+
+
+def test_parser():
+    Item = fact('Item', ['noun'])
+    registry = Registry()
+    parser = Parser(
+        rule(
+            gram('ADJF'),
+            gram('NOUN').interpretation(Item.noun)
+        ).interpretation(Item),
+        metrics=registry
+    )
+    text = 'красивая мама и красивый дом'
+    for match in parser.findall(text):
+        match.fact
+    assert parser.match('красивая мама')
+    assert not list(parser.findall(''))
+
+    assert registry['yargy_documents_total'].value == 3
+    assert registry['yargy_tokens_total'].value == 5 + 2
+    assert registry['yargy_matches_total'].value == 2
+    histogram = registry['yargy_matches_per_document']
+    assert histogram.count == 2
+    assert histogram.sum == 2
+    assert registry['yargy_states_per_token'].count == 2
+    assert registry['yargy_morph_cache_misses'].value >= 0
+    assert registry['yargy_inflection_cache_hits'].value >= 0
+
+    data = json.loads(registry.dumps())
+    assert data['yargy_documents_total'] == 3
+    assert 'yargy_tokens_per_second_bucket{le="+Inf"} 2' in (
+        registry.as_prometheus.splitlines()
+    )
+
+    # shared by parsers, copy in other process counts on its own
+    other = MultiParser([rule(INT), rule(INT, INT)], metrics=registry)
+    items, pairs = other.findall('1 2')
+    assert len(items) == 2 and len(pairs) == 1
+    assert registry['yargy_documents_total'].value == 4
+    assert registry['yargy_matches_total'].value == 2 + 3
+    copy = pickle.loads(pickle.dumps(other))
+    copy.findall('1')
+    assert copy.metrics.documents.value == 5
+    assert registry['yargy_documents_total'].value == 4
+
+
+def test_partial_queries():
+    registry = Registry()
+    parser = Parser(rule(INT), metrics=registry)
+    assert parser.find('1 2 3')
+    histogram = registry['yargy_matches_per_document']
+    # find stops early, matches are not counted
+    assert histogram.count == 0
+    assert registry['yargy_documents_total'].value == 1
+
+    assert parser.contains('a 1')
+    assert not parser.contains('a b')
+    assert registry['yargy_documents_total'].value == 3
+    assert registry['yargy_tokens_total'].value == 3 + 2 + 2
+    assert registry['yargy_states_per_token'].count == 3
+
+
+def test_shared_cache():
+    # parser sent to worker with pickle keeps shared normalizer cache,
+    # cache gauges read it
+    cache = pickle.loads(pickle.dumps(normalizer.CACHE))
+    assert cache is normalizer.CACHE
+    other = normalizer.NormalizerCache()
+    assert pickle.loads(pickle.dumps(other)) is not other
+
+
+def test_violations():
+    registry = Registry()
+    item = forward()
+    item.define(or_(rule(INT), rule(item, item)))
+    parser = Parser(item, limits=Limits(columns=20), metrics=registry)
+    with pytest.raises(ChartLimitError):
+        parser.findall(' '.join('1' * 10))
+    with pytest.raises(DeadlineExceeded):
+        parser.findall('1', deadline=Deadline(timeout=-1))
+    assert registry['yargy_limit_violations_total'].value == 1
+    assert registry['yargy_deadline_expired_total'].value == 1
+    assert registry['yargy_documents_total'].value == 0
@@ -0,0 +1,56 @@
+
+from yargy import (
+    Parser,
+    rule,
+    and_,
+    not_
+)
+from yargy.predicates import (
+    eq,
+    gram,
+    type,
+    is_capitalized
+)
+from yargy.relations import gnc_relation
+from yargy.interpretation import fact
+from yargy.parallel import findall
+
+
+Name = fact(
+    'Name',
+    ['first', 'last']
+)
+
+TEXT = '\n'.join(
+    'Иван Петров и Анна Иванова, 12.%d и 1 2 3. Мария Петров\n\n' % index
+    for index in range(20)
+)
+
+
+def check(parser, facts=False, **kwargs):
+    expected = list(parser.findall(TEXT))
+    assert expected
+    for workers in [1, 2]:
+        matches = list(findall(parser, TEXT, workers=workers, **kwargs))
+        assert [_.span for _ in matches] == [_.span for _ in expected]
+        if facts:
+            assert [_.fact for _ in matches] == [_.fact for _ in expected]
+
+
+def test_bounded():
+    gnc = gnc_relation()
+    NAME = rule(
+        gram('Name').interpretation(Name.first.inflected()).match(gnc),
+        gram('Surn').interpretation(Name.last.inflected()).match(gnc)
+    ).interpretation(Name)
+    NUMBER = rule(type('INT'), eq('.').optional(), type('INT').optional())
+    check(Parser(NAME), facts=True, chunk_size=7)
+    check(Parser(NUMBER), chunk_size=6)
+
+
+def test_unbounded():
+    WORDS = rule(
+        and_(is_capitalized(), not_(type('EOL'))),
+        not_(type('EOL')).repeatable()
+    )
+    check(Parser(WORDS), chunk_size=10)
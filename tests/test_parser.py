@@ -0,0 +1,477 @@
+
+from itertools import product
+
+import pytest
+
+from yargy import (
+    Parser,
+    MultiParser,
+    rule,
+    or_,
+    forward
+)
+from yargy.predicates import (
+    eq,
+    gram,
+    type
+)
+from yargy.parser import (
+    Chart,
+    Limits,
+    ChartLimitError
+)
+from yargy.tokenizer import Tokenizer
+from yargy.relations import gnc_relation
+from yargy.pipelines import morph_pipeline
+from yargy.rule.bnf import INF
+from yargy.interpretation import fact
+
+
+Date = fact(
+    'Date',
+    ['day', 'month']
+)
+
+INT = type('INT')
+MONTH = morph_pipeline([
+    'январь',
+    'февраль'
+])
+DATE = rule(
+    INT.interpretation(Date.day),
+    MONTH.interpretation(Date.month.normalized())
+).interpretation(Date)
+NUMBER = rule(INT, eq('.'), INT).named('NUMBER')
+NOUN = rule(gram('NOUN').repeatable()).named('NOUN')
+MONTH_ONLY = rule(MONTH).named('MONTH_ONLY')
+
+
+def spans(matches):
+    return [_.span for _ in matches]
+
+
+def test_multi_parser():
+    text = '3 февраля и 1.5 января, 2 января'
+    rules = [DATE, NUMBER, NOUN, MONTH_ONLY, DATE]
+    parser = MultiParser(rules)
+
+    results = parser.findall(text)
+    assert len(results) == len(rules)
+    for rule_, matches in zip(rules, results):
+        expected = Parser(rule_).findall(text)
+        assert spans(matches) == spans(expected)
+
+    dates = results[0]
+    assert [_.fact for _ in dates] == [
+        Date(day='3', month='февраль'),
+        Date(day='5', month='январь'),
+        Date(day='2', month='январь'),
+    ]
+    assert results[4] == dates
+
+    extracted = parser.extract(text)
+    assert spans(extracted[1]) == spans(Parser(NUMBER).extract(text))
+
+    matches = parser.find('1.5')
+    assert matches[1].span == (0, 3)
+    assert matches[0] is None and matches[3] is None
+    assert parser.match('январь')[3].span == (0, 6)
+    assert parser.match('январь')[0] is None
+
+
+def test_multi_parser_shared():
+    # MONTH is compiled once, one set of states for all grammars
+    def count(chart):
+        return sum(len(_.states) for _ in chart.columns)
+
+    text = '1 января'
+    rules = [DATE, MONTH_ONLY, or_(DATE, MONTH_ONLY)]
+    parser = MultiParser(rules)
+    shared = count(parser.chart(text))
+    separate = sum(count(Parser(_).chart(text)) for _ in rules)
+    assert shared < separate
+
+    results = parser.findall(text)
+    assert spans(results[2]) == spans(Parser(rules[2]).findall(text))
+
+
+def test_match_whole_text():
+    # root of one grammar is subrule of other, predicted mid text
+    M = rule(gram('NOUN')).named('M')
+    parser = MultiParser([M, rule(INT, M)])
+    first, second = parser.match('1 января')
+    assert first is None
+    assert second.span == (0, 8)
+    assert Parser(M).match('1 января') is None
+
+    # recursive root, suffix completes, whole text does not
+    item = forward()
+    item.define(or_(
+        rule(eq('a'), item, eq('x')),
+        rule(eq('b'))
+    ))
+    assert Parser(item).match('a b') is None
+
+
+def test_tokens():
+    text = '3 февраля и 1.5 января'
+    parser = Parser(DATE)
+    other = Parser(NUMBER, tokenizer=parser.tokenizer)
+    tokens = list(parser.tokenize(text))
+
+    matches = list(parser.findall_tokens(tokens, text))
+    assert [_.text for _ in matches] == ['3 февраля', '5 января']
+    assert spans(matches) == spans(parser.findall(text))
+    assert other.find_tokens(tokens).span == (12, 15)
+    assert parser.match_tokens(tokens[:2]).fact == Date(
+        day='3',
+        month='февраль'
+    )
+
+    with pytest.raises(ValueError):
+        # not morphed
+        list(parser.findall_tokens(Tokenizer()(text)))
+
+    tokenizer = Tokenizer().remove_types('EOL')
+    with pytest.raises(ValueError):
+        Parser(NUMBER, tokenizer=tokenizer).chart_tokens(
+            Tokenizer()('1.5\n')
+        )
+
+
+def disambiguated(parser, text, grams):
+    # pre-tokenized input, forms of ambiguous words are narrowed by
+    # caller, grams[i] for i-th RU token
+    grams = iter(grams)
+    for token in parser.tokenize(text):
+        if token.type == 'RU':
+            gram_ = next(grams)
+            token = token.morphed([
+                _ for _ in token.forms
+                if gram_ in _.grams
+            ])
+        yield token
+
+
+def test_barriers():
+    text = 'красивая\nмама, красивая мама'
+    CROSS = rule(gram('ADJF'), type('EOL').optional(), gram('NOUN'))
+    parser = Parser(CROSS)
+    assert len(list(parser.findall(text))) == 2
+
+    parser = Parser(CROSS, barriers=[type('EOL')])
+    assert [_.text for _ in parser.findall(text)] == ['красивая мама']
+
+    parser = Parser(CROSS, barriers=[eq(',')])
+    chart = parser.chart(text)
+    assert len(list(parser.chart_findall(chart))) == 2
+    # columns before barrier do not keep indexes
+    assert not chart.columns[1].states_index
+
+    for rule_ in [CROSS, NUMBER, DATE]:
+        expected = spans(Parser(rule_).findall(text))
+        parser = Parser(rule_, infer_barriers=True)
+        assert spans(parser.findall(text)) == expected
+
+    # same value, different forms, dead token memo is keyed by forms
+    text = 'стали . стали .'
+    VERB = rule(gram('VERB'), eq('.'))
+    parser = Parser(VERB, infer_barriers=True)
+    tokens = list(disambiguated(parser, text, ['NOUN', 'VERB']))
+    assert spans(parser.findall_tokens(tokens, text)) == [(8, 15)]
+
+
+def test_length_bounds():
+    assert tuple(DATE.length_bounds) == (2, 2)
+    assert tuple(NUMBER.length_bounds) == (3, 3)
+    assert tuple(rule(INT, eq('.').optional()).length_bounds) == (1, 2)
+    assert tuple(NOUN.length_bounds) == (1, INF)
+    assert not DATE.unbounded
+    unbounded = NOUN.unbounded
+    assert unbounded and all(_.length_bounds.max == INF for _ in unbounded)
+
+    parser = Parser(NUMBER)
+    assert tuple(parser.length_bounds) == (3, 3)
+    assert tuple(MultiParser([NUMBER, DATE]).length_bounds) == (2, 3)
+
+    text = '1.2 и 3.4 и 5'
+    chart = parser.chart(text)
+    assert [_.text for _ in parser.chart_findall(chart)] == ['1.2', '3.4']
+    # no seeds where NUMBER does not fit
+    assert not chart.columns[-1].states
+    assert not chart.columns[-2].states
+    assert chart.columns[-3].states
+
+
+def test_automaton():
+    text = '3 февраля и 1.5 января, 2 января, красивая мама'
+    for rule_ in [DATE, NUMBER, NOUN, or_(DATE, NUMBER)]:
+        expected = Parser(rule_).findall(text)
+        parser = Parser(rule_, automaton=True)
+        assert parser.automaton
+        assert spans(parser.findall(text)) == spans(expected)
+    assert [_.fact for _ in Parser(DATE, automaton=True).findall(text)] == [
+        _.fact for _ in Parser(DATE).findall(text)
+    ]
+
+    parser = Parser(DATE, automaton=True)
+    tokens = list(parser.tokenize(text))
+    starts = parser.automaton.valid_starts(tokens)
+    assert [index for index, _ in enumerate(starts) if _] == [0, 5, 8]
+
+    # not regular, a ( a ) b
+    item = forward()
+    item.define(or_(
+        rule(INT, item, eq('.')),
+        rule(eq('.'))
+    ))
+    assert not Parser(item, automaton=True).automaton
+    # nullable
+    assert not Parser(rule(INT.optional()), automaton=True).automaton
+
+    multi = MultiParser([DATE, NUMBER], automaton=True)
+    assert multi.automaton
+    assert spans(multi.findall(text)[1]) == spans(Parser(NUMBER).findall(text))
+
+    # same value, different forms, token signature memo is keyed by
+    # forms, memo is kept across documents
+    text = 'стали . стали .'
+    VERB = rule(gram('VERB'), eq('.'))
+    parser = Parser(VERB, automaton=True)
+    tokens = list(disambiguated(parser, text, ['VERB', 'NOUN']))
+    assert spans(parser.findall_tokens(tokens, text)) == [(0, 7)]
+    tokens = list(disambiguated(parser, text, ['NOUN', 'VERB']))
+    assert spans(parser.findall_tokens(tokens, text)) == [(8, 15)]
+
+
+def test_automaton_threads(monkeypatch):
+    import sys
+    from concurrent.futures import ThreadPoolExecutor
+    from yargy import automaton
+
+    # memo is reset often, parser is shared by threads
+    monkeypatch.setattr(automaton, 'CACHE_SIZE', 4)
+    parser = Parser(DATE, automaton=True)
+    texts = [
+        '%d февраля и 1.5 января, %d января, мама' % (index, index + 1)
+        for index in range(20)
+    ]
+    tokens = [list(parser.tokenize(_)) for _ in texts]
+    expected = [parser.automaton.valid_starts(_) for _ in tokens]
+
+    def run(_):
+        return [
+            parser.automaton.valid_starts(item)
+            for _ in range(10)
+            for item in tokens
+        ]
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(run, range(16)))
+    finally:
+        sys.setswitchinterval(interval)
+    assert all(_ == expected * 10 for _ in results)
+
+
+def test_prediction_closure():
+    A = rule(INT, eq('.')).named('A')
+    B = rule(A, INT).named('B')
+    C = or_(rule(B, INT.repeatable()), rule(eq('x'))).named('C')
+    parser = Parser(C)
+    labels = [_.label for _ in parser.rule.closure]
+    assert labels[0] == 'C' and 'B' in labels and 'A' in labels
+
+    chart = parser.chart('1 . 2 3 4 . 5 6')
+    assert [_.text for _ in parser.chart_findall(chart)] == [
+        '1 . 2 3',
+        '4 . 5 6'
+    ]
+    # closure is predicted once per column, nodes of seeds are shared
+    first, second = chart.columns[0], chart.columns[1]
+    assert {id(_) for _ in parser.rule.closure} <= first.predicted
+    nodes = {id(_.node) for _ in first if _.dot_index == 0}
+    assert nodes & {id(_.node) for _ in second if _.dot_index == 0}
+
+
+def test_nullable():
+    ADJF = gram('ADJF')
+    item = rule(
+        ADJF.optional(),
+        ADJF.optional(),
+        gram('NOUN').optional().repeatable(),
+        INT.optional(),
+        gram('NOUN'),
+        rule(eq(','), INT).optional().repeatable()
+    )
+    parser = Parser(item)
+    text = 'В 2017 году компания открыла'
+    assert {_.text for _ in parser.extract(text)} == {
+        'В',
+        'В 2017 году',
+        '2017 году',
+        'году',
+        'году компания',
+        'компания'
+    }
+
+    # same grammar with optional terms expanded to alternatives, no
+    # nullable rules. Same matches, skip adds no states over expansion
+    expanded = or_(*[
+        rule(*(adjfs + nouns + ints + [gram('NOUN')] + tail))
+        for adjfs, nouns, ints, tail in product(
+            [[], [ADJF], [ADJF, ADJF]],
+            [[], [gram('NOUN').repeatable()]],
+            [[], [INT]],
+            [[], [rule(eq(','), INT).repeatable()]]
+        )
+    ])
+    baseline = Parser(expanded)
+    assert (
+        {_.text for _ in parser.extract(text)}
+        == {_.text for _ in baseline.extract(text)}
+    )
+    assert (
+        [_.span for _ in parser.findall(text)]
+        == [_.span for _ in baseline.findall(text)]
+    )
+    size = sum(len(_.states) for _ in parser.chart(text).columns)
+    assert size < sum(len(_.states) for _ in baseline.chart(text).columns)
+
+    # nullable rule is skipped with empty tree
+    parser = Parser(rule(INT.optional(), eq('.')))
+    match = parser.match('.')
+    assert match and match.text == '.'
+    assert [_.value for _ in match.tokens] == ['.']
+
+
+def test_contains_count():
+    text = '3 февраля и 1.5 января, 2 января'
+    for rule_ in [DATE, NUMBER, NOUN, MONTH_ONLY]:
+        parser = Parser(rule_)
+        count = len(list(parser.findall(text)))
+        assert parser.count(text) == count
+        assert parser.contains(text) == bool(count)
+    assert not Parser(NUMBER).contains('3 февраля')
+    assert Parser(NUMBER).count('3 февраля') == 0
+
+    # relations are validated
+    gnc = gnc_relation()
+    PAIR = rule(gram('ADJF').match(gnc), gram('NOUN').match(gnc))
+    parser = Parser(PAIR)
+    assert not parser.contains('красивого мама')
+    assert parser.contains('красивого мамы, красивая мама')
+    assert parser.count('красивая мама и красивый дом') == 2
+
+    # stops early, later columns are not built
+    chart = Chart(parser.tokenize('красивая мама и красивый дом'))
+    assert parser.iter_contains(parser.iter_chart(chart))
+    assert not chart.columns[-1].states
+
+    parser = MultiParser([DATE, NUMBER, DATE])
+    assert parser.contains('1.5 и 2 января') == [True, True, True]
+    assert parser.contains('1.5 и') == [False, True, False]
+    assert parser.count(text) == [3, 1, 3]
+
+
+def test_best_trees():
+    from yargy.parser import (
+        prepare_trees,
+        best_trees
+    )
+
+    # ambiguous: many trees for every span
+    A = forward()
+    A.define(or_(
+        rule(INT),
+        rule(A, A),
+        rule(A, eq('+'), A)
+    ))
+    parser = Parser(A)
+    text = '1 + 2 3 + 4 5'
+    trees = list(prepare_trees(parser.matches(text)))
+    assert len(trees) > len(set(_.range for _ in trees))
+    best = list(best_trees(trees))
+    for a, b in zip(best, best[1:]):
+        assert not b < a
+
+    match = parser.match(text)
+    assert match.text == text
+    assert match.tree == sorted(
+        _ for _ in trees if _.range == (0, len(match.tokens))
+    )[0]
+
+    top = list(parser.extract(text, k=3))
+    assert len(top) == 3
+    assert top[0].tree == best[0]
+    assert len(list(parser.extract(text, k=0))) == 0
+
+    assert [_.text for _ in parser.findall(text)] == [text]
+
+
+def ambiguous():
+    # number of trees grows fast with length
+    item = forward()
+    return item.define(or_(
+        rule(INT),
+        rule(item, item)
+    ).named('A'))
+
+
+def test_limits():
+    text = ' '.join('1' * 12)
+    parser = Parser(ambiguous())
+    matches = list(parser.findall(text))
+    assert [_.text for _ in matches] == [text]
+    size = sum(len(_.states) for _ in parser.chart(text).columns)
+
+    parser = Parser(ambiguous(), limits=Limits(columns=50))
+    with pytest.raises(ChartLimitError) as error:
+        parser.findall(text)
+    assert error.value.limit == 'columns'
+    assert error.value.value == 51
+    assert error.value.rule == 'A'
+
+    parser = Parser(ambiguous(), limits=Limits(states=size - 1))
+    with pytest.raises(ChartLimitError) as error:
+        parser.count(text)
+    assert error.value.limit == 'states'
+
+    parser = Parser(ambiguous(), limits=Limits(trees=2))
+    with pytest.raises(ChartLimitError) as error:
+        parser.match(text)
+    assert error.value.limit == 'trees'
+
+    # prune, chart is smaller, still finds a match
+    for limits in [
+            Limits(columns=50, prune=True),
+            Limits(trees=2, prune=True)
+    ]:
+        parser = Parser(ambiguous(), limits=limits)
+        chart = parser.chart(text)
+        assert chart.pruned
+        assert max(
+            len([_ for _ in column if _.dot_index])
+            for column in chart.columns
+        ) <= 50
+        assert sum(len(_.states) for _ in chart.columns) < size
+        assert parser.match(text).text == text
+
+    parser = Parser(ambiguous(), limits=Limits(states=100, prune=True))
+    chart = parser.chart(text)
+    assert chart.pruned == 1
+    assert [_.text for _ in parser.chart_findall(chart)] == ['1 1 1 1 1 1']
+
+    # worse tree is scanned first, states are ranked before first
+    # overflow, best is kept
+    item = rule(INT).named('X')
+    item = or_(rule(item, INT), rule(INT, INT)).named('A')
+    parser = Parser(item, limits=Limits(trees=1, prune=True))
+    assert parser.match('1 2').tree.root.rank == 0
+    assert parser.chart('1 2').pruned == 1
+
+    # no overflow, same result
+    parser = Parser(ambiguous(), limits=Limits(columns=10 ** 6, trees=10 ** 6))
+    assert [_.text for _ in parser.findall(text)] == [text]
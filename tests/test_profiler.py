@@ -0,0 +1,59 @@
+
+import json
+
+from yargy import (
+    Parser,
+    rule,
+    or_
+)
+from yargy.predicates import (
+    eq,
+    gram,
+    type
+)
+from yargy.relations import gnc_relation
+from yargy.interpretation import fact
+
+
+def test_profiler():
+    Item = fact('Item', ['noun'])
+    gnc = gnc_relation()
+    PAIR = rule(
+        gram('ADJF').match(gnc),
+        gram('NOUN').match(gnc).interpretation(Item.noun)
+    ).named('PAIR')
+    YEAR = rule(type('INT'), eq('году')).named('YEAR')
+    parser = Parser(or_(PAIR, YEAR).named('ITEM').interpretation(Item))
+    text = 'В 2017 году красивая мама, красивого мама'
+
+    with parser.profile() as profiler:
+        matches = list(parser.findall(text))
+        facts = [_.fact for _ in matches]
+    assert [_.text for _ in matches] == ['2017 году', 'красивая мама']
+    assert facts == [Item(), Item(noun='мама')]
+    # instance is restored
+    assert 'scan' not in parser.__dict__
+    assert parser.profiler is None
+
+    rules = {_.name: _ for _ in profiler.rules.values()}
+    assert rules['PAIR'].completed == 2
+    assert rules['YEAR'].completed == 1
+    root = rules['Item']
+    assert root.trees == 3
+    assert root.invalid == 1
+    assert root.discarded == 1
+    assert root.matches == 2
+    assert root.interpretation_time > 0
+
+    predicates = {_.name: _ for _ in profiler.predicates.values()}
+    assert predicates["gram('ADJF')"].matched == 2
+    assert predicates["'году'"].calls == 1
+
+    data = json.loads(profiler.dumps())
+    assert data['rules'][0]['name'] in rules
+    lines = profiler.table.splitlines()
+    assert lines[0].split()[:3] == ['rule', 'predicted', 'scanned']
+
+    # not counted after detach
+    parser.findall(text)
+    assert rules['PAIR'].completed == 2
@@ -0,0 +1,103 @@
+
+import json
+from io import StringIO, BytesIO
+
+from yargy import (
+    Parser,
+    rule,
+)
+from yargy.predicates import gram
+from yargy.interpretation import fact
+from yargy.sink import (
+    JSONLSink,
+    BinarySink,
+    load_binary
+)
+
+
+Name = fact(
+    'Name',
+    ['first', 'last']
+)
+Person = fact(
+    'Person',
+    ['name', 'age']
+)
+
+NAME = rule(
+    gram('Name').interpretation(
+        Name.first.inflected()
+    ),
+    gram('Surn').interpretation(
+        Name.last.inflected()
+    ).optional()
+).interpretation(
+    Name
+)
+PERSON = rule(
+    NAME.interpretation(
+        Person.name
+    )
+).interpretation(
+    Person
+)
+
+TEXT = 'саше иванову и пете'
+
+
+def test_slots():
+    record = Name(first='саша')
+    assert not hasattr(record, '__dict__')
+    assert record.first == 'саша'
+    assert record.last is None
+
+    record.last = 'иванов'
+    assert record == Name(first='саша', last='иванов')
+
+
+def test_jsonl():
+    parser = Parser(PERSON)
+    matches = list(parser.findall(TEXT))
+
+    file = StringIO()
+    with JSONLSink(file, batch_size=1) as sink:
+        sink.write_all(matches, id='doc')
+
+    lines = file.getvalue().splitlines()
+    assert len(lines) == 2
+    records = [json.loads(_) for _ in lines]
+    assert records[0] == {
+        'id': 'doc',
+        'span': [0, 12],
+        'rule': 'Person',
+        'fact': {'name': {'first': 'саша', 'last': 'иванов'}}
+    }
+    assert [_['fact'] for _ in records] == [
+        _.fact.as_json
+        for _ in matches
+    ]
+
+
+def test_jsonl_no_fact():
+    parser = Parser(rule('a').named('A'))
+    file = StringIO()
+    with JSONLSink(file) as sink:
+        sink.write_all(parser.findall('a b a'))
+    assert file.getvalue() == (
+        '{"span":[0,1],"rule":"A"}\n'
+        '{"span":[4,5],"rule":"A"}\n'
+    )
+
+
+def test_binary():
+    parser = Parser(PERSON)
+    file = BytesIO()
+    with BinarySink(file, batch_size=1) as sink:
+        sink.write_all(parser.findall(TEXT))
+
+    file.seek(0)
+    records = list(load_binary(file))
+    assert records == [
+        (None, 0, 12, 'Person', ('Person', (('Name', ('саша', 'иванов')), None))),
+        (None, 15, 19, 'Person', ('Person', (('Name', ('петя', None)), None))),
+    ]
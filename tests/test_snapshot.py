@@ -0,0 +1,151 @@
+
+import pytest
+
+from yargy import (
+    Parser,
+    rule,
+    and_,
+    not_
+)
+from yargy.predicates import (
+    gram,
+    custom
+)
+from yargy.pipelines import morph_pipeline
+from yargy.relations import gnc_relation
+from yargy.interpretation import fact
+from yargy.interpretation import normalizer
+from yargy.rule.bnf import BNFRule
+from yargy.parser import Limits
+from yargy.trace import Tracer
+from yargy.metrics import Registry
+
+
+Name = fact(
+    'Name',
+    ['first', 'last']
+)
+Person = fact(
+    'Person',
+    ['position', 'name', 'tags']
+)
+
+
+def is_title(value):
+    return value.istitle()
+
+
+def grammar():
+    gnc = gnc_relation()
+    NAME = rule(
+        and_(gram('Name'), custom(is_title)).interpretation(
+            Name.first.inflected()
+        ).match(gnc),
+        and_(gram('Surn'), not_(gram('Abbr'))).interpretation(
+            Name.last.inflected()
+        ).match(gnc)
+    ).interpretation(
+        Name
+    )
+    POSITION = morph_pipeline([
+        'управляющий директор',
+        'вице-мэр'
+    ])
+    return rule(
+        POSITION.interpretation(
+            Person.position.normalized()
+        ).match(gnc),
+        NAME.interpretation(
+            Person.name
+        )
+    ).interpretation(
+        Person
+    )
+
+
+TEXT = 'управляющего директора Ивана Ульянова и вице-мэра Петра Иванова'
+
+
+def test_snapshot(tmp_path):
+    path = str(tmp_path / 'parser.bin')
+    parser = Parser(grammar())
+    parser.save(path)
+
+    loaded = Parser.load(path, morph=parser.tokenizer.morph)
+    assert loaded.tokenizer.morph is parser.tokenizer.morph
+
+    facts = [_.fact for _ in parser.findall(TEXT)]
+    assert [_.fact for _ in loaded.findall(TEXT)] == facts
+    assert facts[0] == Person(
+        position='управляющий директор',
+        name=Name(first='иван', last='ульянов'),
+        tags=None
+    )
+
+
+def normalizers(parser):
+    for item in parser.rule.walk(types=BNFRule):
+        value = getattr(item.interpretator, 'normalizer', None)
+        if value is not None:
+            yield value
+
+
+def test_normalizer_cache(tmp_path):
+    # shared cache is stored by reference, not with cached values
+    path = str(tmp_path / 'parser.bin')
+    parser = Parser(grammar())
+    [_.fact for _ in parser.findall(TEXT)]
+    assert len(normalizer.CACHE.forms)
+    parser.save(path)
+    normalizer.CACHE.clear()
+
+    loaded = Parser.load(path, morph=parser.tokenizer.morph)
+    items = list(normalizers(loaded))
+    assert items
+    for item in items:
+        assert item.cache is normalizer.CACHE
+    assert not len(normalizer.CACHE.forms)
+
+
+def test_runtime(tmp_path):
+    # limits, tracer, metrics are not stored, passed to load
+    path = str(tmp_path / 'parser.bin')
+    registry = Registry()
+    parser = Parser(
+        rule('a'),
+        limits=Limits(columns=100),
+        tracer=Tracer(),
+        metrics=registry
+    )
+    parser.save(path)
+    assert parser.limits and parser.tracer and parser.metrics
+
+    loaded = Parser.load(path)
+    assert loaded.limits is None
+    assert loaded.tracer is None
+    assert loaded.metrics is None
+
+    loaded = Parser.load(path, metrics=registry)
+    assert loaded.metrics.registry is registry
+    assert loaded.match('a')
+    assert registry['yargy_documents_total'].value == 1
+
+
+def test_local_fact(tmp_path):
+    path = str(tmp_path / 'parser.bin')
+    F = fact('F', ['a', 'b'])
+    parser = Parser(rule('a').interpretation(F.a).interpretation(F))
+    parser.save(path)
+
+    loaded = Parser.load(path)
+    record = loaded.match('a').fact
+    assert record.__class__ is not F
+    assert record.__class__.__name__ == 'F'
+    assert record.as_json == {'a': 'a'}
+
+
+def test_header(tmp_path):
+    path = tmp_path / 'parser.bin'
+    path.write_bytes(b'not a snapshot')
+    with pytest.raises(ValueError):
+        Parser.load(str(path))
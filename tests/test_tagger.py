@@ -1,4 +1,6 @@
 
+import pytest
+
 from yargy import Parser
 from yargy.tagger import Tagger
 from yargy.predicates import tag
@@ -32,3 +34,18 @@ def test_tagger():
         for start, stop in spans
     ]
     assert substrings == ['b c', 'e f']
+
+
+def test_tagger_tokens():
+    text = 'a b c d e f g'
+    parser = Parser(tag('I').repeatable(), tagger=MyTagger())
+    tokens = list(parser.tokenize(text))
+    assert len(list(parser.findall_tokens(tokens))) == 2
+
+    # not tagged, parser with tagger would silently match nothing
+    with pytest.raises(ValueError):
+        parser.findall_tokens(parser.tokenizer(text))
+
+    tokens[0] = tokens[0].tagged('X')
+    with pytest.raises(ValueError):
+        parser.findall_tokens(tokens)
@@ -21,6 +21,7 @@ from yargy.tokenizer import (
     OTHER,
 
     EMAIL_RULE,
+    TokenRule,
 
     Tokenizer,
     MorphTokenizer,
@@ -99,3 +100,52 @@ def test_join_tokens():
     tokenizer = Tokenizer()
     tokens = tokenizer('pi =        3.14')
     assert join_tokens(tokens) == 'pi = 3.14'
+
+
+def test_buffer():
+    from yargy.predicates import gram
+    from yargy.tagger import PassTagger
+    from yargy.parser import Context
+
+    tokenizer = MorphTokenizer()
+    text = 'стали стали 1 500'
+    buffer = tokenizer.buffer(text)
+    tokens = list(tokenizer(text))
+
+    assert len(buffer) == 4
+    assert list(buffer) == tokens
+    assert buffer[-1] == tokens[-1]
+    assert buffer[1:3] == tokens[1:3]
+    assert buffer.split() == tokenizer.split(text)
+    assert len(buffer.values) == 3
+    assert len(buffer.forms) == 1
+    # lower and number are stored, not recomputed
+    assert [_.lower for _ in buffer] == [_.lower for _ in tokens]
+    assert [_.number for _ in buffer] == [None, None, 1, 500]
+
+    other = tokenizer.buffer('Сталь 7')
+    assert other[0].lower == 'сталь'
+    assert other[1].number == 7
+    assert len(other.values) == 3
+
+    predicate = gram('VERB').activate(Context(tokenizer, PassTagger()))
+    assert predicate(buffer[0])
+    assert not predicate(buffer[2])
+
+    with pytest.raises(IndexError):
+        buffer[4]
+
+
+def test_payload():
+    tokenizer = Tokenizer()
+    a, b, c, d = tokenizer('Мама 12 мама 12')
+    assert a.lower == 'мама'
+    assert b.number == 12
+    assert a.normalized == c.normalized
+    assert b.value is d.value
+    assert a.number is None
+
+    tokenizer = Tokenizer().add_rules(TokenRule(INT, r'\d+,\d+'))
+    token, = tokenizer('1,5')
+    assert token.type == INT
+    assert token.number is None
@@ -0,0 +1,94 @@
+
+import json
+import pickle
+
+from yargy import (
+    Parser,
+    rule
+)
+from yargy.predicates import (
+    gram,
+    type
+)
+from yargy.interpretation import fact
+from yargy.relations import gnc_relation
+from yargy.tokenizer import MorphTokenizer
+from yargy.trace import Tracer
+
+
+def test_tracer():
+    Item = fact('Item', ['noun'])
+    gnc = gnc_relation()
+    PAIR = rule(
+        gram('ADJF').match(gnc),
+        gram('NOUN').match(gnc).interpretation(Item.noun)
+    ).interpretation(Item)
+    events = []
+    tracer = Tracer(callback=events.append)
+    parser = Parser(PAIR, tracer=tracer)
+    text = 'красивая мама, красивого мама, 2017'
+
+    matches = list(parser.findall(text))
+    assert [_.fact for _ in matches] == [Item(noun='мама')]
+    assert [_.name for _ in tracer.events] == [
+        'tokenize', 'morph', 'tag', 'chart',
+        'relations', 'relations', 'resolve',
+        'interpret'
+    ]
+    assert events == tracer.events
+    tokenize, morph, tag, chart = tracer.events[:4]
+    assert tokenize.args == {'chars': len(text), 'tokens': 7}
+    # analyzer calls inside tokenize, one per russian token
+    assert morph.args == {'tokens': 7, 'calls': 4}
+    assert morph.start == tokenize.start
+    assert morph.duration <= tokenize.duration
+    assert tag.args == {'tokens': 7}
+    assert chart.args['tokens'] == 7
+    assert chart.args['states'] > 0
+    assert [_.args['valid'] for _ in tracer.events[4:6]] == [True, False]
+    assert tracer.events[6].args == {'spans': 1, 'matches': 1}
+    assert all(_.duration >= 0 for _ in tracer.events)
+
+    data = json.loads(tracer.dumps())
+    event = data['traceEvents'][0]
+    assert event['name'] == 'tokenize'
+    assert event['ph'] == 'X'
+
+    # events are not pickled with parser
+    assert pickle.loads(pickle.dumps(tracer)).events == []
+
+    # without tracer same result, tokens are lazy
+    parser = Parser(PAIR)
+    assert [_.fact for _ in parser.findall(text)] == [Item(noun='мама')]
+
+    tracer = Tracer(keep=False)
+    parser = Parser(rule(type('INT')), tracer=tracer)
+    assert parser.match('1')
+    assert tracer.events == []
+
+
+class StopTokenizer(MorphTokenizer):
+    # drops tokens in its own __call__
+    def __call__(self, text):
+        tokens = super(StopTokenizer, self).__call__(text)
+        return (_ for _ in tokens if _.value != 'и')
+
+
+def test_tokenizer_call():
+    tracer = Tracer()
+    tokenizer = StopTokenizer()
+    parser = Parser(rule(gram('NOUN'), gram('NOUN')), tokenizer=tokenizer)
+    text = 'мама и папа'
+    assert parser.match(text)
+
+    # with tracer tokenizer is called same way
+    parser = Parser(
+        rule(gram('NOUN'), gram('NOUN')),
+        tokenizer=tokenizer,
+        tracer=tracer
+    )
+    assert parser.match(text)
+    tokenize, morph = tracer.events[:2]
+    assert tokenize.args == {'chars': len(text), 'tokens': 2}
+    assert morph.name == 'morph'
+    assert morph.args == {'tokens': 2, 'calls': 3}
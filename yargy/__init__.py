@@ -1,4 +1,7 @@
 
 
-from .parser import Parser
+from .parser import (
+    Parser,
+    MultiParser
+)
 from .api import *
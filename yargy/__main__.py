@@ -0,0 +1,235 @@
+
+import os
+import sys
+import json
+import argparse
+from time import perf_counter
+from collections import deque
+from importlib import import_module
+
+from .parser import Parser
+from .rule.constructors import is_rule
+from .sink import (
+    dumps,
+    format_match
+)
+from .batch import (
+    CHUNKSIZE,
+    extract
+)
+
+
+PROGRESS = 1000
+
+
+def load_grammar(path):
+    # package.module:ATTR or package.module:Class.ATTR, rule or parser
+    if ':' not in path:
+        raise ValueError('expected module:attribute, got {path!r}'.format(
+            path=path
+        ))
+    module, name = path.split(':', 1)
+    item = import_module(module)
+    for part in name.split('.'):
+        item = getattr(item, part)
+    if is_rule(item):
+        item = Parser(item)
+    if not isinstance(item, Parser):
+        raise TypeError('expected rule or parser, got {type!r}'.format(
+            type=type(item)
+        ))
+    return item
+
+
+def read_jsonl(file):
+    for line in file:
+        line = line.strip()
+        if line:
+            item = json.loads(line)
+            yield item['id'], item['text']
+
+
+def read_file(path):
+    if path.endswith('.jsonl'):
+        with open(path, encoding='utf8') as file:
+            for record in read_jsonl(file):
+                yield record
+    else:
+        with open(path, encoding='utf8') as file:
+            yield path, file.read()
+
+
+def list_files(path):
+    if os.path.isdir(path):
+        for root, dirs, names in os.walk(path):
+            dirs.sort()
+            for name in sorted(names):
+                yield os.path.join(root, name)
+    else:
+        yield path
+
+
+def read_documents(paths, stdin):
+    # Files are documents with path as id, *.jsonl and stdin are
+    # {"id": ..., "text": ...} per line
+    if not paths or paths == ['-']:
+        for record in read_jsonl(stdin):
+            yield record
+        return
+
+    for path in paths:
+        for path in list_files(path):
+            for record in read_file(path):
+                yield record
+
+
+def read_ids(path):
+    # Output of interrupted run, last line may be cut, drop it
+    ids = set()
+    if not os.path.exists(path):
+        return ids
+
+    with open(path, 'rb+') as file:
+        data = file.read()
+        size = data.rfind(b'\n') + 1
+        if size < len(data):
+            file.truncate(size)
+    for line in data[:size].decode('utf8').splitlines():
+        ids.add(json.loads(line)['id'])
+    return ids
+
+
+def format_matches(matches):
+    chunks = ['[']
+    for index, match in enumerate(matches):
+        if index > 0:
+            chunks.append(',')
+        chunks.extend(format_match(match))
+    chunks.append(']')
+    return ''.join(chunks)
+
+
+class Progress(object):
+    def __init__(self, file, every=PROGRESS):
+        self.file = file
+        self.every = every
+        self.start = perf_counter()
+        self.documents = 0
+        self.skipped = 0
+
+    def report(self):
+        duration = perf_counter() - self.start
+        print(
+            '{documents} docs, {skipped} skipped, {rate:.1f} docs/s'.format(
+                documents=self.documents,
+                skipped=self.skipped,
+                rate=self.documents / duration if duration else 0
+            ),
+            file=self.file
+        )
+
+    def update(self):
+        self.documents += 1
+        if self.documents % self.every == 0:
+            self.report()
+
+
+def run(parser, documents, output, workers=1, chunksize=CHUNKSIZE,
+        skip=(), progress=None):
+    ids = deque()
+
+    def texts():
+        for id, text in documents:
+            if id in skip:
+                if progress:
+                    progress.skipped += 1
+                continue
+            ids.append(id)
+            yield text
+
+    results = extract(
+        parser, texts(),
+        workers=workers,
+        chunksize=chunksize,
+        prepare=format_matches
+    )
+    for matches in results:
+        output.write('{"id":%s,"matches":%s}\n' % (
+            dumps(ids.popleft()),
+            matches
+        ))
+        if progress:
+            progress.update()
+    if progress:
+        progress.report()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m yargy',
+        description='Extract matches from documents, write JSONL'
+    )
+    parser.add_argument(
+        'grammar',
+        help='module:attribute, rule or Parser'
+    )
+    parser.add_argument(
+        'inputs', nargs='*',
+        help=(
+            'files or directories, each file is a document, *.jsonl and '
+            'stdin are {"id": ..., "text": ...} per line'
+        )
+    )
+    parser.add_argument('-o', '--output', help='default stdout')
+    parser.add_argument('-w', '--workers', type=int, default=1)
+    parser.add_argument('-c', '--chunksize', type=int, default=CHUNKSIZE)
+    parser.add_argument(
+        '-p', '--progress', action='store_true',
+        help='report throughput to stderr'
+    )
+    parser.add_argument(
+        '-r', '--resume', action='store_true',
+        help='skip ids already in output, append'
+    )
+    return parser
+
+
+def main(argv=None, stdin=None, stdout=None, stderr=None):
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+
+    args = build_parser().parse_args(argv)
+    if args.resume and not args.output:
+        raise SystemExit('--resume requires --output')
+
+    parser = load_grammar(args.grammar)
+    documents = read_documents(args.inputs, stdin)
+    skip = set()
+    if args.resume:
+        skip = read_ids(args.output)
+    progress = None
+    if args.progress:
+        progress = Progress(stderr)
+
+    if args.output:
+        mode = 'a' if args.resume else 'w'
+        output = open(args.output, mode, encoding='utf8')
+    else:
+        output = stdout
+    try:
+        run(
+            parser, documents, output,
+            workers=args.workers,
+            chunksize=args.chunksize,
+            skip=skip,
+            progress=progress
+        )
+    finally:
+        if output is not stdout:
+            output.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,165 @@
+
+import asyncio
+from time import monotonic
+from functools import partial
+from concurrent.futures import (
+    ThreadPoolExecutor,
+    ProcessPoolExecutor
+)
+
+from . import batch
+from .deadline import Deadline
+
+
+BATCH_SIZE = 32
+# seconds to wait for more requests before sending partial batch
+DELAY = 0.002
+MAX_PENDING = 1024
+
+
+def process(parser, prepare, items):
+    # (result, error) per text, error in one text does not fail the
+    # batch. Texts past deadline are skipped, caller already gave up,
+    # parsing and prepare are interrupted when deadline passes, matches
+    # prepare consumed are released, their facts can be read later
+    results = []
+    for text, deadline in items:
+        if deadline is not None:
+            if monotonic() > deadline:
+                results.append((None, None))
+                continue
+            deadline = Deadline(deadline=deadline)
+        try:
+            result = prepare(parser.findall(text, deadline=deadline))
+        except Exception as error:
+            results.append((None, error))
+        else:
+            results.append((result, None))
+    return results
+
+
+def process_pool(items):
+    return process(batch.PARSER, batch.PREPARE, items)
+
+
+async def wait(awaitable, deadline):
+    if deadline is None:
+        return await awaitable
+    return await asyncio.wait_for(awaitable, deadline - monotonic())
+
+
+class AsyncExtractor(object):
+    # Parser.findall is CPU bound, run it in executor, concurrent
+    # requests are grouped into batches of up to batch_size, at most
+    # max_pending requests are queued, others wait. timeout is default
+    # per request deadline in seconds, raises asyncio.TimeoutError
+
+    def __init__(self, parser, executor=None, prepare=list,
+                 batch_size=BATCH_SIZE, delay=DELAY,
+                 max_pending=MAX_PENDING, timeout=None):
+        self.parser = parser
+        self.own = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(1)
+        self.executor = executor
+        if isinstance(executor, ProcessPoolExecutor):
+            # parser and prepare live in workers, see processes
+            self.process = process_pool
+        else:
+            self.process = partial(process, parser, prepare)
+
+        self.batch_size = batch_size
+        self.delay = delay
+        self.max_pending = max_pending
+        self.timeout = timeout
+
+        self.batch = []
+        self.handle = None
+        self.semaphore = None
+
+    @classmethod
+    def processes(cls, parser, workers=None, prepare=batch.prepare_tuples,
+                  **kwargs):
+        # Result of prepare is pickled back, default gives plain tuples
+        executor = ProcessPoolExecutor(
+            workers,
+            mp_context=batch.get_context(),
+            initializer=batch.initialize,
+            initargs=(parser, prepare)
+        )
+        extractor = cls(parser, executor, prepare, **kwargs)
+        extractor.own = True
+        return extractor
+
+    async def findall(self, text, timeout=None):
+        if timeout is None:
+            timeout = self.timeout
+        deadline = None
+        if timeout is not None:
+            deadline = monotonic() + timeout
+
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_pending)
+        await wait(self.semaphore.acquire(), deadline)
+        try:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self.batch.append((text, deadline, future))
+            if len(self.batch) >= self.batch_size:
+                self.flush()
+            elif self.handle is None:
+                self.handle = loop.call_later(self.delay, self.flush)
+            return await wait(future, deadline)
+        finally:
+            self.semaphore.release()
+
+    def flush(self):
+        if self.handle is not None:
+            self.handle.cancel()
+            self.handle = None
+        items, self.batch = self.batch, []
+        if not items:
+            return
+
+        loop = asyncio.get_running_loop()
+        task = loop.run_in_executor(
+            self.executor,
+            self.process,
+            [(text, deadline) for text, deadline, _ in items]
+        )
+        task.add_done_callback(partial(self.resolve, items))
+
+    def resolve(self, items, task):
+        if task.cancelled():
+            for _, _, future in items:
+                future.cancel()
+            return
+
+        error = task.exception()
+        if error:
+            results = [(None, error)] * len(items)
+        else:
+            results = task.result()
+
+        now = monotonic()
+        for (_, deadline, future), (result, error) in zip(items, results):
+            if future.done():
+                continue
+            if deadline is not None and now > deadline:
+                future.set_exception(asyncio.TimeoutError())
+            elif error:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    async def close(self):
+        self.flush()
+        if self.own:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.executor.shutdown)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close()
@@ -0,0 +1,201 @@
+
+import threading
+
+from .token import predicate_key
+from .cache import CACHE_SIZE
+from .rule.bnf import is_rule
+
+
+# NFA is built by copying shared rules per call site, give up on
+# grammars that blow up
+MAX_STATES = 10000
+
+ACCEPT = 0
+
+
+class NotRegular(Exception):
+    pass
+
+
+class NFABuilder(object):
+    # Thompson-like construction over BNF, terms right to left. Tail
+    # call to rule that is being built with same continuation is a loop
+    # (repeatable), any other recursion is not regular
+
+    def __init__(self, max_states=MAX_STATES):
+        self.max_states = max_states
+        self.epsilons = [[]]  # ACCEPT
+        self.edges = [[]]
+        self.terminals = []
+        self.terminal_ids = {}
+        self.entries = {}
+        self.stack = set()
+
+    def state(self):
+        if len(self.epsilons) >= self.max_states:
+            raise NotRegular('too many states')
+        self.epsilons.append([])
+        self.edges.append([])
+        return len(self.epsilons) - 1
+
+    def terminal(self, predicate):
+        key = id(predicate)
+        if key not in self.terminal_ids:
+            self.terminal_ids[key] = len(self.terminals)
+            self.terminals.append(predicate)
+        return self.terminal_ids[key]
+
+    def build(self, rule, next):
+        key = id(rule), next
+        if key in self.entries:
+            return self.entries[key]
+        if id(rule) in self.stack:
+            raise NotRegular(rule.label)
+
+        entry = self.state()
+        self.entries[key] = entry
+        self.stack.add(id(rule))
+        for production in rule.productions:
+            target = next
+            for term in reversed(production.terms):
+                if is_rule(term):
+                    target = self.build(term, target)
+                else:
+                    state = self.state()
+                    self.edges[state].append((self.terminal(term), target))
+                    target = state
+            self.epsilons[entry].append(target)
+        self.stack.discard(id(rule))
+        return entry
+
+
+def reverse(adjacency):
+    result = [[] for _ in adjacency]
+    for source, targets in enumerate(adjacency):
+        for item in targets:
+            if isinstance(item, tuple):
+                terminal, target = item
+                result[target].append((terminal, source))
+            else:
+                result[item].append(source)
+    return result
+
+
+class Automaton(object):
+    # Backward run over tokens: live set at i is NFA states from which
+    # some prefix of tokens[i:] reaches ACCEPT. Match starts at i iff
+    # root start state reads at least one token into live set at i + 1.
+    # Sets and token signatures (results of all terminals) are interned,
+    # transitions memoized, lazy DFA. Parser may be shared by threads,
+    # memo is updated under lock, lock is not pickled
+
+    def __init__(self, starts, builder):
+        self.starts = starts
+        self.terminals = builder.terminals
+        self.back_epsilons = reverse(builder.epsilons)
+        self.back_edges = reverse(builder.edges)
+        self.accept = self.closure({ACCEPT})
+        self.lock = threading.Lock()
+
+        self.signatures = {}
+        self.signature_values = []
+        self.signature_ids = {}
+        self.reset()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def reset(self):
+        self.sets = {}
+        self.set_items = []
+        self.transitions = {}
+        self.intern(self.accept)
+
+    @property
+    def size(self):
+        return len(self.back_epsilons)
+
+    def closure(self, states):
+        back_epsilons = self.back_epsilons
+        stack = list(states)
+        result = set(states)
+        while stack:
+            state = stack.pop()
+            for source in back_epsilons[state]:
+                if source not in result:
+                    result.add(source)
+                    stack.append(source)
+        return frozenset(result)
+
+    def intern(self, states):
+        index = self.sets.get(states)
+        if index is None:
+            index = len(self.set_items)
+            self.sets[states] = index
+            self.set_items.append(states)
+        return index
+
+    def signature(self, token):
+        key = predicate_key(token)
+        index = self.signatures.get(key)
+        if index is None:
+            if len(self.signatures) >= CACHE_SIZE:
+                self.signatures.clear()
+            values = tuple(_(token) for _ in self.terminals)
+            index = self.signature_ids.get(values)
+            if index is None:
+                index = len(self.signature_values)
+                self.signature_ids[values] = index
+                self.signature_values.append(values)
+            self.signatures[key] = index
+        return index
+
+    def step(self, live, signature):
+        values = self.signature_values[signature]
+        back_edges = self.back_edges
+        sources = set()
+        for state in self.set_items[live]:
+            for terminal, source in back_edges[state]:
+                if values[terminal]:
+                    sources.add(source)
+        read = self.closure(sources)
+        start = any(_ in read for _ in self.starts)
+        return start, self.intern(read | self.accept)
+
+    def valid_starts(self, tokens):
+        # starts[i] for columns 0..len(tokens), column i seeds tokens[i:]
+        with self.lock:
+            return self.run(tokens)
+
+    def run(self, tokens):
+        if len(self.transitions) >= CACHE_SIZE:
+            self.reset()
+        transitions = self.transitions
+        signature = self.signature
+
+        size = len(tokens)
+        starts = [False] * (size + 1)
+        live = 0  # accept
+        for index in range(size - 1, -1, -1):
+            key = live, signature(tokens[index])
+            item = transitions.get(key)
+            if item is None:
+                item = self.step(*key)
+                transitions[key] = item
+            starts[index], live = item
+        return starts
+
+
+def compile_automaton(roots, max_states=MAX_STATES):
+    builder = NFABuilder(max_states)
+    try:
+        starts = [builder.build(_, ACCEPT) for _ in roots]
+    except (NotRegular, RecursionError):
+        return
+    return Automaton(starts, builder)
@@ -0,0 +1,91 @@
+
+import multiprocessing
+from collections import deque
+from itertools import islice
+
+from .sink import match_tuple
+
+
+CHUNKSIZE = 100
+# chunks waiting in pool per worker, bounds memory for long inputs
+INFLIGHT = 2
+
+PARSER = None
+PREPARE = None
+
+
+def prepare_tuples(matches):
+    return [match_tuple(_) for _ in matches]
+
+
+def chunked(items, size):
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            break
+        yield chunk
+
+
+def process(parser, chunk, prepare):
+    return [
+        prepare(parser.findall(text))
+        for text in chunk
+    ]
+
+
+def initialize(parser, prepare):
+    global PARSER, PREPARE
+    PARSER = parser
+    PREPARE = prepare
+
+
+def process_chunk(chunk):
+    return process(PARSER, chunk, PREPARE)
+
+
+def get_context():
+    # With fork compiled grammar, loaded morph dicts and warm caches
+    # are shared copy-on-write, initializer args are not pickled
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+
+def extract(parser, texts, workers=None, chunksize=CHUNKSIZE,
+            prepare=prepare_tuples, inflight=INFLIGHT):
+    # Yields prepare(parser.findall(text)) for every text, in input
+    # order. Default prepare gives plain picklable tuples, see
+    # sink.match_tuple. First chunk is parsed in the current process,
+    # warms morph caches before workers start
+
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+
+    chunks = chunked(texts, chunksize)
+    for chunk in islice(chunks, 1):
+        for result in process(parser, chunk, prepare):
+            yield result
+
+    if workers <= 1:
+        for chunk in chunks:
+            for result in process(parser, chunk, prepare):
+                yield result
+        return
+
+    context = get_context()
+    with context.Pool(
+            workers,
+            initializer=initialize,
+            initargs=(parser, prepare)
+    ) as pool:
+        queue = deque()
+        size = workers * inflight
+        for chunk in chunks:
+            queue.append(pool.apply_async(process_chunk, (chunk,)))
+            if len(queue) >= size:
+                for result in queue.popleft().get():
+                    yield result
+        while queue:
+            for result in queue.popleft().get():
+                yield result
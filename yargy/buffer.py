@@ -0,0 +1,144 @@
+
+from array import array
+
+from .span import Span
+from .token import (
+    Token,
+    MorphToken,
+    TagToken,
+    MorphTagToken,
+    is_morph_token,
+    is_tag_token
+)
+
+
+NONE = 0
+
+
+class Table(object):
+    # Unique values, value -> code. Code 0 is reserved for None
+
+    def __init__(self, key=None):
+        self.key = key
+        self.items = [None]
+        self.codes = {}
+
+    def encode(self, item):
+        if item is None:
+            return NONE
+        key = item
+        if self.key:
+            key = self.key(item)
+        code = self.codes.get(key)
+        if code is None:
+            code = len(self.items)
+            self.codes[key] = code
+            self.items.append(item)
+        return code
+
+    def decode(self, code):
+        return self.items[code]
+
+    def __len__(self):
+        return len(self.items) - 1
+
+
+class TokenBuffer(object):
+    # Columnar storage for tokens: offsets in arrays, values, lower,
+    # numbers, types, tags and morph forms as codes into tables of unique
+    # items. Tokens are materialized on every access, equal to tokenizer
+    # output, so predicates, Chart etc work as is. Saves memory only
+    # while tokens are stored, Chart makes list of tokens, parsed
+    # buffer has every token alive
+
+    def __init__(self, tokens=()):
+        self.starts = array('q')
+        self.stops = array('q')
+        self.value_codes = array('q')
+        self.lower_codes = array('q')
+        self.number_codes = array('q')
+        self.type_codes = array('q')
+        self.tag_codes = array('q')
+        self.forms_codes = array('q')
+
+        # value and its lower are mostly same str
+        self.values = Table()
+        self.numbers = Table()
+        self.types = Table()
+        self.tags = Table()
+        # CachedMorphAnalyzer returns same list for same word
+        self.forms = Table(key=id)
+
+        self.extend(tokens)
+
+    def append(self, token):
+        start, stop = token.span
+        self.starts.append(start)
+        self.stops.append(stop)
+        self.value_codes.append(self.values.encode(token.value))
+        self.lower_codes.append(self.values.encode(token.lower))
+        self.number_codes.append(self.numbers.encode(token.number))
+        self.type_codes.append(self.types.encode(token.type))
+        self.tag_codes.append(self.tags.encode(
+            token.tag
+            if is_tag_token(token)
+            else None
+        ))
+        self.forms_codes.append(self.forms.encode(
+            token.forms
+            if is_morph_token(token)
+            else None
+        ))
+
+    def extend(self, tokens):
+        for token in tokens:
+            self.append(token)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def span(self, index):
+        return Span(self.starts[index], self.stops[index])
+
+    def value(self, index):
+        return self.values.decode(self.value_codes[index])
+
+    def token(self, index):
+        value = self.value(index)
+        span = self.span(index)
+        type = self.types.decode(self.type_codes[index])
+        tag = self.tags.decode(self.tag_codes[index])
+        forms = self.forms.decode(self.forms_codes[index])
+        lower = self.values.decode(self.lower_codes[index])
+        number = self.numbers.decode(self.number_codes[index])
+
+        if forms is not None and tag is not None:
+            return MorphTagToken(value, span, type, tag, forms, lower, number)
+        elif forms is not None:
+            return MorphToken(value, span, type, forms, lower, number)
+        elif tag is not None:
+            return TagToken(value, span, type, tag, lower, number)
+        else:
+            return Token(value, span, type, lower, number)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [
+                self.token(_)
+                for _ in range(*index.indices(len(self)))
+            ]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self.token(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.token(index)
+
+    def split(self):
+        return [self.value(_) for _ in range(len(self))]
+
+    def __repr__(self):
+        return 'TokenBuffer([...{size} tokens])'.format(size=len(self))
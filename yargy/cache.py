@@ -0,0 +1,87 @@
+
+import threading
+from collections import OrderedDict
+
+from .record import Record
+
+
+CACHE_SIZE = 10000
+
+
+class CacheInfo(Record):
+    __attributes__ = ['hits', 'misses', 'size', 'max_size']
+
+    def __init__(self, hits, misses, size, max_size):
+        self.hits = hits
+        self.misses = misses
+        self.size = size
+        self.max_size = max_size
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        if not total:
+            return 0.0
+        return self.hits / total
+
+
+class Cache(object):
+    # Bounded LRU, unlike functools.lru_cache can be shared between
+    # several objects and inspected/cleared from outside. Module CACHE
+    # of normalizers is shared by parsers in threads, updates are under
+    # lock, lock is not pickled
+
+    def __init__(self, max_size=CACHE_SIZE):
+        self.max_size = max_size
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        data = self.data
+        with self.lock:
+            if key in data:
+                self.hits += 1
+                data.move_to_end(key)
+                return data[key]
+            self.misses += 1
+
+    def set(self, key, value):
+        data = self.data
+        with self.lock:
+            data[key] = value
+            if len(data) > self.max_size:
+                data.popitem(last=False)
+
+    def __len__(self):
+        return len(self.data)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def info(self):
+        return CacheInfo(
+            self.hits, self.misses,
+            len(self.data), self.max_size
+        )
+
+    @property
+    def hit_rate(self):
+        return self.info.hit_rate
+
+    def __repr__(self):
+        return 'Cache(max_size={self.max_size!r}, ...)'.format(self=self)
@@ -0,0 +1,63 @@
+
+from time import monotonic
+
+
+# check deadline once per so many tokens/columns, monotonic() is cheap
+# but not free
+TOKENS_STEP = 64
+COLUMNS_STEP = 8
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class Deadline(object):
+    # Cooperative cancellation: expires at monotonic() time deadline,
+    # timeout seconds from now or when cancel() is called, for example
+    # from other thread. Parser checks it while tokenizing, building
+    # chart and interpreting. Raises DeadlineExceeded or, with partial,
+    # parser stops and returns matches found so far
+
+    def __init__(self, timeout=None, deadline=None, partial=False):
+        if timeout is not None:
+            deadline = monotonic() + timeout
+        self.deadline = deadline
+        self.partial = partial
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    @property
+    def expired(self):
+        return self.cancelled or (
+            self.deadline is not None
+            and monotonic() > self.deadline
+        )
+
+    def check(self):
+        # True if expired and partial
+        if not self.expired:
+            return False
+        if self.partial:
+            return True
+        raise DeadlineExceeded(
+            'cancelled'
+            if self.cancelled
+            else 'deadline exceeded'
+        )
+
+    def __repr__(self):
+        return 'Deadline(deadline={deadline!r}, partial={partial!r})'.format(
+            deadline=self.deadline,
+            partial=self.partial
+        )
+
+
+def check_tokens(tokens, deadline, step=TOKENS_STEP):
+    # Tokenizer, morph and tagger are lazy, checked as tokens are pulled
+    for index, token in enumerate(tokens):
+        if not index % step and deadline.check():
+            return
+        yield token
@@ -6,7 +6,8 @@ from .normalizer import (
     InflectedNormalizer,
     NormalizedNormalizer,
     ConstNormalizer,
-    FunctionNormalizer
+    FunctionNormalizer,
+    NormalizerCache
 )
 from .interpretator import (
     Interpretator,
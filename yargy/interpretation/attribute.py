@@ -12,6 +12,10 @@ from .normalizer import (
 )
 
 
+def attribute_slot(name):
+    return '_value_' + name
+
+
 class AttributeSchemeBase(Record):
     __attributes__ = ['name']
 
@@ -53,6 +57,14 @@ class AttributeBase(Record):
             name=self.name
         )
 
+    def __get__(self, fact, type=None):
+        if fact is None:
+            return self
+        return getattr(fact, attribute_slot(self.name))
+
+    def __set__(self, fact, value):
+        setattr(fact, attribute_slot(self.name), value)
+
 
 class Attribute(AttributeBase):
     __attributes__ = ['fact', 'name', 'default']
@@ -1,33 +1,37 @@
 
+import sys
 from collections import OrderedDict
 
 from yargy.record import Record
 
 from .attribute import (
     AttributeSchemeBase,
-    RepeatableAttribute
+    RepeatableAttribute,
+    attribute_slot
 )
 
 
 class Fact(Record):
     __attributes__ = []
-    _raw = None
+    __slots__ = ['_raw']
 
     def __init__(self, **kwargs):
         for key in kwargs:
             if key not in self.__attributes__:
                 raise KeyError(key)
 
+        cls = self.__class__
         for key in self.__attributes__:
             if key in kwargs:
                 value = kwargs[key]
             else:
-                attribute = getattr(self, key)
+                attribute = getattr(cls, key)
                 if isinstance(attribute, RepeatableAttribute):
                     value = []
                 else:
                     value = attribute.default
             setattr(self, key, value)
+        self._raw = None
 
     @property
     def as_json(self):
@@ -50,20 +54,28 @@ def prepare_attribute(item):
 
 
 def fact(name, attributes):
+    # Values are stored in slots, no per instance __dict__. Class
+    # attributes F.a are Attribute descriptors that proxy to slots
+    attributes = [prepare_attribute(_) for _ in attributes]
+    keys = [_.name for _ in attributes]
     cls = type(
         str(name),
         (Fact,),
-        dict(__attributes__=[],
-             _raw=None)
+        dict(__attributes__=keys,
+             __slots__=[attribute_slot(_) for _ in keys])
     )
 
-    for item in attributes:
-        attribute = prepare_attribute(item)
+    for attribute in attributes:
         key = attribute.name
-        cls.__attributes__.append(key)
         attribute = attribute.construct(cls)
         setattr(cls, str(key), attribute)
 
+    # Like namedtuple, so module level facts are pickled by reference
+    try:
+        cls.__module__ = sys._getframe(1).f_globals.get('__name__', '__main__')
+    except (AttributeError, ValueError):
+        pass
+
     return cls
 
 
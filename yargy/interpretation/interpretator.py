@@ -6,7 +6,8 @@ from yargy.check import assert_subclass
 from yargy.token import (
     is_token,
     join_tokens,
-    get_tokens_span
+    get_tokens_span,
+    tokens_text
 )
 from .attribute import (
     AttributeBase,
@@ -26,9 +27,10 @@ from .fact import (
 class InterpretatorInput(Record):
     __attributes__ = ['items', 'key']
 
-    def __init__(self, items, key=None):
+    def __init__(self, items, key=None, document=None):
         self.items = list(items)
         self.key = key
+        self.document = document
 
 
 class InterpretatorResult(Record):
@@ -39,17 +41,40 @@ class InterpretatorResult(Record):
 class Chain(InterpretatorResult):
     __attributes__ = ['tokens', 'key']
 
-    def __init__(self, tokens, key):
+    def __init__(self, tokens, key, document=None):
         self.tokens = tokens
         self.key = key
+        self.document = document
 
     @property
     def normalized(self):
         return join_tokens(self.tokens)
 
+    @property
+    def span(self):
+        # None for empty slice, same as text is ''
+        if not self.tokens:
+            return None
+        return get_tokens_span(self.tokens)
+
     @property
     def spans(self):
-        yield get_tokens_span(self.tokens)
+        if self.tokens:
+            yield self.span
+
+    @property
+    def text(self):
+        if self.document is None:
+            return join_tokens(self.tokens)
+        return tokens_text(self.tokens, self.document)
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return Chain(self.tokens[index], None, self.document)
+        return self.tokens[index]
 
     @property
     def as_json(self):
@@ -161,7 +186,7 @@ class AttributeInterpretator(Interpretator):
     def __call__(self, input):
         items = input.items
         if all(is_token(_) for _ in items):
-            value = Chain(items, input.key)
+            value = Chain(items, input.key, input.document)
         elif len(items) == 1:
             item = items[0]
             if isinstance(item, AttributeResult):
@@ -194,7 +219,7 @@ class NormalizerInterpretator(Interpretator):
         else:
             items = input.items
             if all(is_token(_) for _ in items):
-                input = Chain(items, input.key)
+                input = Chain(items, input.key, input.document)
             elif len(items) == 1:
                 input = items[0]
             else:
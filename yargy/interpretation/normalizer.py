@@ -1,9 +1,12 @@
 
 from yargy.record import Record
 from yargy.check import assert_type
+from yargy.cache import Cache
 from yargy.token import (
     join_normalized_tokens,
-    join_inflected_tokens
+    join_inflected_tokens,
+    grams_key,
+    tokens_key
 )
 
 
@@ -12,16 +15,77 @@ class Normalizer(Record):
         raise NotImplementedError
 
 
+class NormalizerCache(Record):
+    __attributes__ = ['forms', 'chains']
+
+    def __init__(self, forms=None, chains=None):
+        if forms is None:
+            forms = Cache()
+        if chains is None:
+            chains = Cache()
+        self.forms = forms
+        self.chains = chains
+
+    def clear(self):
+        self.forms.clear()
+        self.chains.clear()
+
+    def __reduce__(self):
+        # Module CACHE is pickled by reference, parser sent to worker
+        # or loaded from snapshot keeps using shared cache
+        if self is CACHE:
+            return 'CACHE'
+        return NormalizerCache, (self.forms, self.chains)
+
+
+# Shared by all normalizers unless cache=... is passed explicitly,
+# surnames, cities etc repeat a lot across documents
+CACHE = NormalizerCache()
+
+
 class MorphNormalizer(Normalizer):
-    pass
+    cache = None
+
+    def normalize(self, tokens):
+        raise NotImplementedError
+
+    def key(self, tokens):
+        raise NotImplementedError
+
+    def cached(self, tokens):
+        cache = self.cache
+        if cache is None:
+            return self.normalize(tokens)
+
+        key = self.key(tokens)
+        value = cache.chains.get(key)
+        if value is None:
+            value = self.normalize(tokens)
+            cache.chains.set(key, value)
+        return value
+
+    def __call__(self, item):
+        from .interpretator import Chain
+
+        assert_type(item, Chain)
+        return self.cached(item.tokens)
 
 
 class NormalizedNormalizer(MorphNormalizer):
     label = 'normalized()'
 
+    def __init__(self, cache=CACHE):
+        self.cache = cache
+
     def custom(self, function):
         return MorphFunctionNormalizer(self, function)
 
+    def key(self, tokens):
+        return 'normalized', tokens_key(tokens)
+
+    def normalize(self, tokens):
+        return join_normalized_tokens(tokens)
+
     def __call__(self, item):
         from .interpretator import Chain
 
@@ -29,23 +93,27 @@ class NormalizedNormalizer(MorphNormalizer):
         if item.key:
             return item.key
         else:
-            return join_normalized_tokens(item.tokens)
+            return self.cached(item.tokens)
 
 
 class InflectedNormalizer(MorphNormalizer):
     __attributes__ = ['grams']
 
-    def __init__(self, grams=None):
+    def __init__(self, grams=None, cache=CACHE):
         self.grams = grams
+        self.cache = cache
 
     def custom(self, function):
         return MorphFunctionNormalizer(self, function)
 
-    def __call__(self, item):
-        from .interpretator import Chain
+    def key(self, tokens):
+        return 'inflected', grams_key(self.grams), tokens_key(tokens)
 
-        assert_type(item, Chain)
-        return join_inflected_tokens(item.tokens, self.grams)
+    def normalize(self, tokens):
+        forms = None
+        if self.cache is not None:
+            forms = self.cache.forms
+        return join_inflected_tokens(tokens, self.grams, forms)
 
     @property
     def label(self):
@@ -0,0 +1,380 @@
+
+import json
+import threading
+from time import perf_counter
+from collections import OrderedDict
+
+from .cache import CacheInfo
+from .deadline import DeadlineExceeded
+
+
+INF = float('inf')
+
+TOKENS_PER_SECOND_BUCKETS = [1000, 3000, 10000, 30000, 100000, 300000, 1000000]
+STATES_PER_TOKEN_BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000]
+MATCHES_PER_DOCUMENT_BUCKETS = [0, 1, 2, 5, 10, 20, 50, 100, 200]
+
+
+def format_value(value):
+    if value == INF:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+class Metric(object):
+    # Cumulative, updated under lock, parser may be shared by threads.
+    # Lock is not pickled, parser with metrics can be sent to workers,
+    # workers count on their own copy
+    type = None
+
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def samples(self):
+        raise NotImplementedError
+
+    @property
+    def as_json(self):
+        raise NotImplementedError
+
+    @property
+    def prometheus(self):
+        yield '# HELP {name} {help}'.format(name=self.name, help=self.help)
+        yield '# TYPE {name} {type}'.format(name=self.name, type=self.type)
+        for name, value in self.samples():
+            yield '{name} {value}'.format(
+                name=name,
+                value=format_value(value)
+            )
+
+    def __repr__(self):
+        return '{name}({self.name!r}, ...)'.format(
+            name=self.__class__.__name__,
+            self=self
+        )
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def __init__(self, name, help):
+        super(Counter, self).__init__(name, help)
+        self.value = 0
+
+    def inc(self, value=1):
+        with self.lock:
+            self.value += value
+
+    def samples(self):
+        yield self.name, self.value
+
+    @property
+    def as_json(self):
+        return self.value
+
+
+class Gauge(Metric):
+    # Value is read at export time from source, source() returns number
+    type = 'gauge'
+
+    def __init__(self, name, help, source):
+        super(Gauge, self).__init__(name, help)
+        self.source = source
+
+    @property
+    def value(self):
+        return self.source()
+
+    def samples(self):
+        yield self.name, self.value
+
+    @property
+    def as_json(self):
+        return self.value
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, help, buckets):
+        super(Histogram, self).__init__(name, help)
+        self.buckets = sorted(buckets) + [INF]
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        with self.lock:
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[index] += 1
+                    break
+            self.sum += value
+            self.count += 1
+
+    @property
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield bound, total
+
+    def samples(self):
+        for bound, count in self.cumulative:
+            name = '{name}_bucket{{le="{bound}"}}'.format(
+                name=self.name,
+                bound=format_value(bound)
+            )
+            yield name, count
+        yield self.name + '_sum', self.sum
+        yield self.name + '_count', self.count
+
+    @property
+    def as_json(self):
+        return {
+            'buckets': [
+                [format_value(bound), count]
+                for bound, count in self.cumulative
+            ],
+            'sum': self.sum,
+            'count': self.count
+        }
+
+
+class Registry(object):
+    # Metrics by name, same name gives same metric, so several parsers
+    # can share registry. No external dependencies, export to
+    # Prometheus text format or JSON
+    #
+    # registry = Registry()
+    # parser = Parser(RULE, metrics=registry)
+    # ...
+    # print(registry.as_prometheus)
+
+    def __init__(self):
+        self.metrics = OrderedDict()
+
+    def add(self, cls, name, *args):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = cls(name, *args)
+            self.metrics[name] = metric
+        elif not isinstance(metric, cls):
+            raise ValueError('{name!r} is {type}, not {expected}'.format(
+                name=name,
+                type=metric.type,
+                expected=cls.type
+            ))
+        return metric
+
+    def counter(self, name, help):
+        return self.add(Counter, name, help)
+
+    def gauge(self, name, help, source):
+        return self.add(Gauge, name, help, source)
+
+    def histogram(self, name, help, buckets):
+        return self.add(Histogram, name, help, buckets)
+
+    def __getitem__(self, name):
+        return self.metrics[name]
+
+    def __contains__(self, name):
+        return name in self.metrics
+
+    def __iter__(self):
+        return iter(self.metrics.values())
+
+    @property
+    def as_json(self):
+        return OrderedDict(
+            (_.name, _.as_json)
+            for _ in self
+        )
+
+    def dumps(self, **kwargs):
+        return json.dumps(self.as_json, **kwargs)
+
+    @property
+    def as_prometheus(self):
+        lines = []
+        for metric in self:
+            lines.extend(metric.prometheus)
+        return '\n'.join(lines) + '\n'
+
+
+# Module level registry for services with single set of metrics,
+# Parser(..., metrics=REGISTRY)
+REGISTRY = Registry()
+
+
+MORPH = 'morph'
+INFLECTION = 'inflection'
+NORMALIZATION = 'normalization'
+CACHES = [
+    (INFLECTION, 'Inflected forms cache'),
+    (NORMALIZATION, 'Normalized chains cache'),
+    (MORPH, 'Morph analyzer cache')
+]
+
+
+def morph_cache_info(morph):
+    # CachedMorphAnalyzer uses functools.lru_cache, shared by all
+    # analyzers
+    cache_info = getattr(morph.__call__, 'cache_info', None)
+    if cache_info is None:
+        return CacheInfo(0, 0, 0, 0)
+    info = cache_info()
+    return CacheInfo(info.hits, info.misses, info.currsize, info.maxsize)
+
+
+class CacheStat(object):
+    # Source for Gauge, normalizer caches are looked up on call, module
+    # CACHE is pickled by reference, so same cache normalizers use
+    def __init__(self, cache, key, morph=None):
+        self.cache = cache
+        self.key = key
+        self.morph = morph
+
+    @property
+    def info(self):
+        from .interpretation.normalizer import CACHE
+
+        if self.cache == MORPH:
+            return morph_cache_info(self.morph)
+        elif self.cache == INFLECTION:
+            return CACHE.forms.info
+        return CACHE.chains.info
+
+    def __call__(self):
+        return getattr(self.info, self.key)
+
+
+class DocumentMeasure(object):
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.chart = None
+        self.start = None
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        duration = perf_counter() - self.start
+        metrics = self.metrics
+        if value is None:
+            metrics.document(self.chart, duration)
+        elif isinstance(value, DeadlineExceeded):
+            metrics.expired.inc()
+        else:
+            from .parser import ChartLimitError
+            if isinstance(value, ChartLimitError):
+                metrics.violations.inc()
+
+
+class ParserMetrics(object):
+    # Standard yargy metrics in registry, Parser calls document() for
+    # every chart, matched() for every findall
+
+    def __init__(self, registry, tokenizer=None):
+        self.registry = registry
+        self.documents = registry.counter(
+            'yargy_documents_total',
+            'Documents parsed'
+        )
+        self.tokens = registry.counter(
+            'yargy_tokens_total',
+            'Tokens parsed'
+        )
+        self.states = registry.counter(
+            'yargy_states_total',
+            'Chart states'
+        )
+        self.seconds = registry.counter(
+            'yargy_parse_seconds_total',
+            'Time to tokenize and build charts'
+        )
+        self.matches = registry.counter(
+            'yargy_matches_total',
+            'Matches returned by findall'
+        )
+        self.violations = registry.counter(
+            'yargy_limit_violations_total',
+            'Charts over limits, ChartLimitError or pruned'
+        )
+        self.expired = registry.counter(
+            'yargy_deadline_expired_total',
+            'Parses stopped by deadline or cancel'
+        )
+        self.tokens_per_second = registry.histogram(
+            'yargy_tokens_per_second',
+            'Tokens per second per document',
+            TOKENS_PER_SECOND_BUCKETS
+        )
+        self.states_per_token = registry.histogram(
+            'yargy_states_per_token',
+            'Chart states per token per document',
+            STATES_PER_TOKEN_BUCKETS
+        )
+        self.matches_per_document = registry.histogram(
+            'yargy_matches_per_document',
+            'Matches returned by findall per document',
+            MATCHES_PER_DOCUMENT_BUCKETS
+        )
+
+        morph = getattr(tokenizer, 'morph', None)
+        for cache, help in CACHES:
+            if cache == MORPH and morph is None:
+                continue
+            for key in ['hits', 'misses', 'size']:
+                registry.gauge(
+                    'yargy_{cache}_cache_{key}'.format(cache=cache, key=key),
+                    '{help}, {key}'.format(help=help, key=key),
+                    CacheStat(cache, key, morph)
+                )
+
+    def measure(self):
+        return DocumentMeasure(self)
+
+    def document(self, chart, duration):
+        tokens = len(chart.tokens)
+        states = sum(len(_.states) for _ in chart.columns)
+        self.documents.inc()
+        self.tokens.inc(tokens)
+        self.states.inc(states)
+        self.seconds.inc(duration)
+        if tokens:
+            self.states_per_token.observe(states / tokens)
+            if duration > 0:
+                self.tokens_per_second.observe(tokens / duration)
+        if chart.pruned:
+            self.violations.inc()
+        if chart.expired:
+            self.expired.inc()
+
+    def matched(self, count):
+        self.matches.inc(count)
+        self.matches_per_document.observe(count)
+
+    def count_matches(self, matches):
+        # Counted only when findall is consumed to the end, find stops
+        # after first match, not counted
+        count = 0
+        for match in matches:
+            count += 1
+            yield match
+        self.matched(count)
@@ -0,0 +1,127 @@
+
+import multiprocessing
+
+from .span import resolve_spans
+from .tokenizer import EOL
+from .rule.bnf import (
+    INF,
+    bnf_terminals
+)
+from .parser import (
+    prepare_trees,
+    prepare_valid_spans
+)
+from .batch import get_context
+
+
+# tokens per chunk
+CHUNK_SIZE = 2000
+
+PARSER = None
+TOKENS = None
+
+
+def is_dead(token, terminals):
+    # No grammar terminal accepts token, so no match can contain it
+    return not any(_(token) for _ in terminals)
+
+
+def dead_indexes(parser, tokens):
+    terminals = list(bnf_terminals(parser.rule))
+    cache = {}
+    for index, token in enumerate(tokens):
+        if token.type == EOL:
+            value = token.value
+            if value not in cache:
+                cache[value] = is_dead(token, terminals)
+            if cache[value]:
+                yield index
+
+
+def overlap_chunks(size, chunk_size, length):
+    # Every span of length <= length is inside some chunk
+    step = chunk_size - (length - 1)
+    start = 0
+    while True:
+        stop = min(start + chunk_size, size)
+        yield start, stop
+        if stop >= size:
+            break
+        start += step
+
+
+def split_chunks(size, chunk_size, indexes):
+    # Cut at dead tokens, chunks are at least chunk_size long if
+    # possible, no overlap needed
+    start = 0
+    for index in indexes:
+        if index - start >= chunk_size:
+            yield start, index
+            start = index + 1
+    if start < size:
+        yield start, size
+
+
+def chunk_spans(parser, tokens, start, stop):
+    # Spans of matches that pass relations, relative to document tokens
+    chart = parser.build_chart(tokens[start:stop])
+    trees = prepare_trees(parser.chart_matches(chart))
+    spans = prepare_valid_spans(trees, parser.relations)
+    return [
+        (span_start + start, span_stop + start)
+        for span_start, span_stop in spans
+    ]
+
+
+def initialize(parser, tokens):
+    global PARSER, TOKENS
+    PARSER = parser
+    TOKENS = tokens
+
+
+def process_chunk(chunk):
+    start, stop = chunk
+    return chunk_spans(PARSER, TOKENS, start, stop)
+
+
+def plan_chunks(parser, tokens, chunk_size):
+    size = len(tokens)
+    _, length = parser.length_bounds
+    if length < INF and 2 * length <= chunk_size:
+        return list(overlap_chunks(size, chunk_size, length))
+    return list(split_chunks(size, chunk_size, dead_indexes(parser, tokens)))
+
+
+def findall(parser, text, workers=None, chunk_size=CHUNK_SIZE):
+    # Same result as parser.findall(text). Chunks are parsed in forked
+    # workers, each returns spans of valid matches, spans from all chunks
+    # are resolved together, winners are parsed again as exact matches
+    tokens = list(parser.tokenize(text))
+    chunks = plan_chunks(parser, tokens, chunk_size)
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    workers = min(workers, len(chunks))
+
+    if workers <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        results = [
+            chunk_spans(parser, tokens, start, stop)
+            for start, stop in chunks
+        ]
+    else:
+        context = get_context()
+        with context.Pool(
+                workers,
+                initializer=initialize,
+                initargs=(parser, tokens)
+        ) as pool:
+            results = pool.map(process_chunk, chunks)
+
+    spans = set()
+    for items in results:
+        spans.update(items)
+    # same order as spans in Parser.findall
+    spans = sorted(spans, key=lambda _: (_[0], -_[1]))
+
+    for start, stop in resolve_spans(spans):
+        chart = parser.build_chart(tokens[start:stop], text, all=False)
+        yield parser.chart_match(chart)
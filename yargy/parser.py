@@ -1,30 +1,140 @@
 
+from time import perf_counter
+from heapq import (
+    heapify,
+    heappop
+)
+from itertools import islice
 from collections import defaultdict
 
 from .record import Record
 from .check import assert_type
 
-from .token import get_tokens_span
+from .token import (
+    is_token,
+    is_morph_token,
+    is_tag_token,
+    predicate_key,
+    get_tokens_span,
+    join_tokens,
+    tokens_text
+)
 from .span import resolve_spans
 from .tree import (
     Node,
     Leaf,
     Tree
 )
+from .tree.constructors import is_leaf
 from .tokenizer import (
+    RUSSIAN,
+    TIMER,
     Tokenizer,
-    MorphTokenizer
+    MorphTokenizer,
+    MorphTimer
 )
 from .tagger import (
     Tagger,
     PassTagger
 )
-from .rule.bnf import is_rule
+from .rule.constructors import (
+    Production,
+    OrRule
+)
+from .rule.transformators import (
+    ActivateTransformator,
+    SquashExtendedTransformator,
+    ReplaceExtendedTransformator,
+    ReplaceOrEmptyTransformator,
+    FlattenTransformator
+)
+from .predicates import is_predicate
+from .cache import CACHE_SIZE
+from .trace import Tracer
+from .metrics import (
+    Registry,
+    ParserMetrics
+)
+from .deadline import (
+    COLUMNS_STEP,
+    check_tokens
+)
+from .automaton import compile_automaton
+from .pipelines import is_pipeline_rule
+from .rule.bnf import (
+    is_rule,
+    INF,
+    LengthBounds,
+    bnf_terminals,
+    bnf_closure,
+    bnf_length_bounds,
+    BNF,
+    BNFRule,
+    BNFTransformator,
+    RemoveForwardTransformator
+)
+
+
+class ChartLimitError(Exception):
+    def __init__(self, limit, value, column, rule):
+        self.limit = limit
+        self.value = value
+        self.column = column
+        self.rule = rule
+        super(ChartLimitError, self).__init__(
+            '{limit}: {value} at column {column}, rule {rule}'.format(
+                limit=limit,
+                value=value,
+                column=column,
+                rule=rule
+            )
+        )
+
+
+class Limits(Record):
+    # columns, max states per column; states, max states in chart;
+    # trees, max completed states of one rule per span. Error on
+    # overflow or, with prune, worst states are dropped, chart stops
+    # at states limit, matches found so far are kept. Prune never drops
+    # predictions, there are at most grammar size of them per column
+    __attributes__ = ['columns', 'states', 'trees', 'prune']
+
+    def __init__(self, columns=INF, states=INF, trees=INF, prune=False):
+        self.columns = columns
+        self.states = states
+        self.trees = trees
+        self.prune = prune
+
+    def overflow(self, chart, limit, value, column, rule):
+        if not self.prune:
+            raise ChartLimitError(limit, value, column.index, rule.label)
+        chart.pruned += 1
+
+    def check(self, chart, column, state):
+        # False if state is dropped
+        size = len(column.states)
+        if size >= self.columns and not (self.prune and state.dot_index == 0):
+            self.overflow(chart, 'columns', size + 1, column, state.rule)
+            return False
+        if self.trees < INF and state.completed:
+            key = (id(state.rule), state.start_column.index)
+            trees = column.trees[key]
+            if trees >= self.trees:
+                self.overflow(chart, 'trees', trees + 1, column, state.rule)
+                return False
+            column.trees[key] = trees + 1
+        return True
 
 
 class Chart(object):
-    def __init__(self, tokens):
+    def __init__(self, tokens, text=None, deadline=None):
         self.tokens = list(tokens)
+        self.text = text
+        self.deadline = deadline
+        self.profiler = None
+        self.tracer = None
+        self.pruned = 0
+        self.expired = False
 
         self.columns = [Column(0, None)]
         for index, token in enumerate(self.tokens, 1):
@@ -48,6 +158,13 @@ class Chart(object):
     def last_column(self):
         return self.columns[len(self.columns) - 1]
 
+    def truncate(self, index):
+        # Chart building stopped at column index, drop scanned states
+        # that were never processed
+        for column in self.columns[index:]:
+            column.states = []
+            column.pending = None
+
     def __getitem__(self, index):
         return self.columns[index]
 
@@ -76,6 +193,27 @@ class Column(object):
         self.states = []
         self.hashes = set()
         self.states_index = defaultdict(list)
+        self.predicted = set()
+        self.scanned = {}
+        self.limits = None
+        self.chart = None
+        self.trees = None
+        self.pending = None
+
+    def limit(self, chart, limits):
+        self.limits = limits
+        self.chart = chart
+        self.trees = defaultdict(int)
+        if limits.prune:
+            self.pending = []
+
+    def release(self):
+        # Nothing is added to column after barrier, keep only states
+        self.hashes = set()
+        self.states_index = defaultdict(list)
+        self.predicted = set()
+        self.scanned = {}
+        self.trees = None
 
     def __iter__(self):
         return iter(self.states)
@@ -88,10 +226,29 @@ class Column(object):
     def append(self, state):
         value = hash(state)
         if value not in self.hashes:
+            if self.pending is not None:
+                # scanned before column is processed, limits are checked
+                # in admit, after states are ranked
+                self.hashes.add(value)
+                self.pending.append(state)
+                return
+            limits = self.limits
+            if limits and not limits.check(self.chart, self, state):
+                return
             self.hashes.add(value)
             self.states.append(state)
             self.update_index(state)
 
+    def admit(self):
+        # Prune, best states first, so worst are dropped on overflow,
+        # first overflow included
+        states, self.pending = self.pending, None
+        sort_states(states)
+        for state in states:
+            if self.limits.check(self.chart, self, state):
+                self.states.append(state)
+                self.update_index(state)
+
     def update_index(self, state):
         if not state.completed:
             next_term = state.next_term
@@ -176,8 +333,12 @@ class State(object):
 class Match(Record):
     __attributes__ = ['tokens', 'span']
 
-    def __init__(self, tree):
+    def __init__(self, tree, document=None, deadline=None):
         self.tree = tree
+        self.document = document
+        self.deadline = deadline
+        self.profiler = None
+        self.tracer = None
         self.tokens = [_.token for _ in tree.walk(types=Leaf)]
         self.span = get_tokens_span(self.tokens)
 
@@ -185,10 +346,37 @@ class Match(Record):
     def rule(self):
         return self.tree.root.rule
 
+    @property
+    def text(self):
+        if self.document is None:
+            return join_tokens(self.tokens)
+        return tokens_text(self.tokens, self.document)
+
     @property
     def fact(self):
-        fact = self.tree.interpret()
-        return fact.normalized
+        if self.deadline:
+            self.deadline.check()
+        profiler = self.profiler
+        tracer = self.tracer
+        if profiler or tracer:
+            start = perf_counter()
+        fact = self.tree.interpret(self.document)
+        fact = fact.normalized
+        if profiler or tracer:
+            duration = perf_counter() - start
+            if profiler:
+                profiler.interpreted(self.rule, duration)
+            if tracer:
+                tracer.add('interpret', start, duration, rule=self.rule.label)
+        return fact
+
+
+def whole_matches(states):
+    # Root may be predicted mid text as subrule of itself or of other
+    # grammar, whole text match starts at first column
+    for state in states:
+        if state.start_column.first:
+            yield state
 
 
 def prepare_trees(states):
@@ -199,34 +387,241 @@ def prepare_trees(states):
         )
 
 
-def prepare_match(tree):
+def compare_nodes(a, b, memo):
+    # -1, 0, 1 by ranks of nodes in preorder, leaves skipped. Rank fixes
+    # production, so sequences are prefix free, first differing node
+    # decides. Subtrees shared by trees are same objects, skipped by
+    # identity, results memoized by node ids
+    if a is b:
+        return 0
+    if a.rank != b.rank:
+        return -1 if a.rank < b.rank else 1
+    key = id(a), id(b)
+    result = memo.get(key)
+    if result is None:
+        result = 0
+        for x, y in zip(a.children, b.children):
+            if is_leaf(x) or is_leaf(y):
+                continue
+            result = compare_nodes(x, y, memo)
+            if result:
+                break
+        memo[key] = result
+    return result
+
+
+class RankKey(object):
+    # Start, longer first, then compare_nodes, then index. Consistent
+    # with Tree.__lt__, its ties are ordered too. Compares lazily, no
+    # rank vector is built for whole tree
+    __slots__ = ['start', 'stop', 'node', 'index', 'memo']
+
+    def __init__(self, start, stop, node, index, memo):
+        self.start = start
+        self.stop = stop
+        self.node = node
+        self.index = index
+        self.memo = memo
+
+    def __lt__(self, other):
+        if self.start != other.start:
+            return self.start < other.start
+        if self.stop != other.stop:
+            return self.stop > other.stop
+        result = compare_nodes(self.node, other.node, self.memo)
+        if result:
+            return result < 0
+        return self.index < other.index
+
+
+def sort_states(states):
+    # Same order as best_trees for partial states, beam keeps best first
+    memo = {}
+    states.sort(key=lambda _: RankKey(
+        _.start_column.index, _.stop_column.index,
+        _.node, 0, memo
+    ))
+
+
+def best_trees(trees):
+    # Lazy sorted. Heap of lazy keys: first tree after O(n) comparisons,
+    # each stops at first differing node, shared subtrees are skipped.
+    # Every tree is still compared once, there is no packed forest to
+    # expand best tree from
+    memo = {}
+    heap = []
+    for index, tree in enumerate(trees):
+        start, stop = tree.range
+        heap.append((RankKey(start, stop, tree.root, index, memo), tree))
+    heapify(heap)
+    while heap:
+        yield heappop(heap)[-1]
+
+
+def span_trees(trees):
+    spans = defaultdict(list)
+    for tree in trees:
+        spans[tree.range].append(tree)
+    return sorted(
+        spans.items(),
+        key=lambda _: (_[0][0], -_[0][1])
+    )
+
+
+def prepare_match(tree, document=None, deadline=None, profiler=None,
+                  tracer=None):
+    if tracer:
+        start = perf_counter()
+        match = prepare_match(tree, document, deadline, profiler)
+        tracer.add(
+            'relations', start, perf_counter() - start,
+            rule=tree.root.rule.label,
+            valid=match is not None
+        )
+        if match is not None:
+            match.tracer = tracer
+        return match
+    if profiler:
+        return profiler.prepare_match(tree, document, deadline)
     tree = tree.normalized
     relations = tree.relations
     if relations.validate():
         tree = tree.constrain(relations)
-        return Match(tree)
+        return Match(tree, document, deadline)
+
+
+def validate_tree(tree):
+    return tree.normalized.relations.validate()
+
+
+def prepare_valid_spans(trees, relations=True):
+    # Same spans as prepare_resolved_matches before resolve, trees are
+    # not ordered, no Match objects, span is valid if any of its trees
+    # is. Without relations in grammar every tree is valid
+    for span, items in span_trees(trees):
+        if not relations or any(validate_tree(_) for _ in items):
+            yield span
 
 
-def prepare_matches(states):
+def count_resolved(trees, relations=True):
+    spans = list(prepare_valid_spans(trees, relations))
+    return len(list(resolve_spans(spans)))
+
+
+def prepare_matches(states, document=None, deadline=None, profiler=None,
+                    tracer=None):
     for state in states:
-        match = prepare_match(state)
+        match = prepare_match(state, document, deadline, profiler, tracer)
         if match:
             yield match
 
 
-def prepare_resolved_matches(trees):
+def release_deadline(matches):
+    # Match.fact checks deadline only while query runs, match returned
+    # on time is interpreted later without it
+    for match in matches:
+        if match is not None:
+            match.deadline = None
+    return matches
+
+
+def iter_released(matches):
+    # Lazy queries, deadline is released when iteration ends or stops
+    yielded = []
+    try:
+        for match in matches:
+            yielded.append(match)
+            yield match
+    finally:
+        release_deadline(yielded)
+
+
+def prepare_resolved_matches(trees, document=None, deadline=None,
+                             profiler=None, tracer=None):
+    # Best valid tree per span, only trees of span are ordered
     spans = []
     span_matches = {}
-    for tree in trees:
-        span = tree.range
-        if span not in span_matches:
-            match = prepare_match(tree)
-            if match:
-                spans.append(span)
-                span_matches[span] = match
+    for span, items in span_trees(trees):
+        if profiler:
+            profiler.trees(items)
+        ordered = best_trees(items)
+        matches = prepare_matches(
+            ordered, document,
+            deadline, profiler, tracer
+        )
+        for match in matches:
+            spans.append(span)
+            span_matches[span] = match
+            break
+
+    resolved = resolve_spans(spans)
+    if tracer:
+        with tracer.span('resolve', spans=len(spans)) as trace:
+            resolved = list(resolved)
+            trace.args['matches'] = len(resolved)
+
+    for span in resolved:
+        match = span_matches[span]
+        if profiler:
+            profiler.resolved(match)
+        yield match
+
+
+def prepare_nodes(rule, productions):
+    return [
+        Node(rule, production, rank=index, children=[])
+        for index, production in enumerate(productions)
+    ]
+
+
+def prepare_empty_nodes(rules):
+    # Tree for empty match of nullable rule, first nullable production
+    # by rank. Rounds, so that N -> N | e picks e, not a cycle
+    for rule in rules:
+        rule.empty = None
+    changed = True
+    while changed:
+        changed = False
+        for rule in rules:
+            if rule.empty:
+                continue
+            for index, production in enumerate(rule.productions):
+                terms = production.terms
+                if all(is_rule(_) and _.empty for _ in terms):
+                    rule.empty = Node(
+                        rule, production,
+                        rank=index,
+                        children=[_.empty for _ in terms]
+                    )
+                    changed = True
+                    break
 
-    for span in resolve_spans(spans):
-        yield span_matches[span]
+
+def has_relations(roots):
+    for root in roots:
+        for rule in root.walk(types=BNFRule):
+            if rule.relation:
+                return True
+    return False
+
+
+def prepare_predictions(roots):
+    # Prediction closure per BNF rule: rule and rules reachable through
+    # leading terms (Aycock, Horspool). Empty nodes of predicted states
+    # are never changed, shared between columns. Pipeline productions
+    # depend on token, nodes is None
+    rules = {}
+    for root in roots:
+        for rule in root.walk(types=BNFRule):
+            rules[id(rule)] = rule
+    rules = list(rules.values())
+
+    prepare_empty_nodes(rules)
+    for rule in rules:
+        rule.closure = list(bnf_closure(rule))
+        rule.nodes = None
+        if not is_pipeline_rule(rule):
+            rule.nodes = prepare_nodes(rule, rule.productions)
 
 
 class Context(Record):
@@ -237,8 +632,47 @@ class Context(Record):
         self.tagger = tagger
 
 
+def compile_rules(rules, context):
+    # Same stages as Rule.normalized + Rule.as_bnf, but one transformator
+    # per stage for all rules, so subrules shared by several grammars
+    # become one BNF rule
+    root = OrRule(rules)
+    ActivateTransformator(context)(root)
+    for cls in [
+            SquashExtendedTransformator,
+            ReplaceExtendedTransformator,
+            ReplaceOrEmptyTransformator,
+            FlattenTransformator,
+            BNFTransformator
+    ]:
+        transformator = cls()
+        root = transformator(root)
+        rules = [transformator.visit(_) for _ in rules]
+
+    root = BNFRule([Production([_]) for _ in rules])
+    RemoveForwardTransformator()(root)
+    BNF(root.walk(types=BNFRule))  # name unnamed rules
+    return [_.terms[0] for _ in root.productions]
+
+
 class Parser(object):
-    def __init__(self, rule, tokenizer=None, tagger=None):
+    profiler = None
+
+    def __init__(self, rule, tokenizer=None, tagger=None,
+                 barriers=None, infer_barriers=False, automaton=False,
+                 limits=None, tracer=None, metrics=None):
+        context = self.prepare(tokenizer, tagger, limits, tracer, metrics)
+        rule = rule.activate(context)
+        rule = rule.normalized
+        self.rule = rule.as_bnf.start
+        self.prepare_barriers(context, [self.rule], barriers, infer_barriers)
+        self.length_bounds = self.rule.length_bounds
+        self.relations = has_relations([self.rule])
+        prepare_predictions([self.rule])
+        self.prepare_automaton([self.rule], automaton)
+
+    def prepare(self, tokenizer=None, tagger=None, limits=None, tracer=None,
+                metrics=None):
         if not tokenizer:
             tokenizer = MorphTokenizer()
         assert_type(tokenizer, Tokenizer)
@@ -249,18 +683,230 @@ class Parser(object):
         assert_type(tagger, Tagger)
         self.tagger = tagger
 
-        context = Context(tokenizer, tagger)
-        rule = rule.activate(context)
-        rule = rule.normalized
-        self.rule = rule.as_bnf.start
+        self.prepare_runtime(limits, tracer, metrics)
+        return Context(tokenizer, tagger)
+
+    def prepare_runtime(self, limits=None, tracer=None, metrics=None):
+        # Belong to running process, not stored in snapshot, passed to
+        # load again
+        if limits is not None:
+            assert_type(limits, Limits)
+        self.limits = limits
+        if tracer is not None:
+            assert_type(tracer, Tracer)
+        self.tracer = tracer
+
+        # metrics, Registry, standard parser metrics are added to it
+        if metrics is not None:
+            assert_type(metrics, Registry)
+            metrics = ParserMetrics(metrics, self.tokenizer)
+        self.metrics = metrics
+
+    def prepare_barriers(self, context, roots, barriers, infer_barriers):
+        # No match contains barrier token, states are not scanned into
+        # it. With infer_barriers tokens no grammar terminal accepts are
+        # barriers too, does not change result
+        self.barriers = []
+        for predicate in barriers or []:
+            assert is_predicate(predicate), predicate
+            self.barriers.append(predicate.activate(context))
+
+        self.terminals = None
+        if infer_barriers:
+            terminals = {}
+            for root in roots:
+                for terminal in bnf_terminals(root):
+                    terminals[id(terminal)] = terminal
+            self.terminals = list(terminals.values())
+        self.dead = {}
+
+    def prepare_automaton(self, roots, automaton):
+        # Regular grammar (no recursion except repeatable loops) is
+        # compiled to automaton, it finds columns where some match
+        # starts, chart is seeded only there, result is same. Not
+        # regular or nullable grammar, automaton is None
+        self.automaton = None
+        if automaton and self.length_bounds.min > 0:
+            self.automaton = compile_automaton(roots)
+
+    def is_dead(self, token):
+        key = predicate_key(token)
+        dead = self.dead.get(key)
+        if dead is None:
+            if len(self.dead) >= CACHE_SIZE:
+                self.dead.clear()
+            dead = not any(_(token) for _ in self.terminals)
+            self.dead[key] = dead
+        return dead
 
-    def chart(self, text, all=True):
-        tokens = self.tokenizer(text)
-        tokens = self.tagger(tokens)
-        chart = Chart(tokens)
+    def is_barrier(self, token):
+        for predicate in self.barriers:
+            if predicate(token):
+                return True
+        return self.terminals is not None and self.is_dead(token)
+
+    def profile(self):
+        # with parser.profile() as profiler: ..., see yargy.profiler
+        from .profiler import Profiler
+        return Profiler(self)
+
+    def save(self, path):
+        from .snapshot import save_parser
+        save_parser(self, path)
+
+    @staticmethod
+    def load(path, morph=None, limits=None, tracer=None, metrics=None):
+        from .snapshot import load_parser
+        return load_parser(path, morph, limits, tracer, metrics)
+
+    def tokenize(self, text, deadline=None):
+        if self.tracer:
+            tokens = self.trace_tokenize(text)
+        else:
+            tokens = self.tokenizer(text)
+            tokens = self.tagger(tokens)
+        if deadline:
+            tokens = check_tokens(tokens, deadline)
+        return tokens
+
+    def trace_tokenize(self, text):
+        # Stages are lazy and chained, with tracer each one is run to
+        # the end, so time of tag is not counted as tokenize. Tokenizer
+        # is called as is, subclasses may override __call__. Morph
+        # analyzer calls are timed inside tokenize, reported as morph
+        # event with their total duration
+        tracer = self.tracer
+        timer = MorphTimer()
+        TIMER.morph = timer
+        try:
+            with tracer.span('tokenize', chars=len(text)) as span:
+                tokens = list(self.tokenizer(text))
+                span.args['tokens'] = len(tokens)
+        finally:
+            TIMER.morph = None
+        if isinstance(self.tokenizer, MorphTokenizer):
+            tracer.add(
+                'morph', span.start, timer.seconds,
+                tokens=len(tokens),
+                calls=timer.calls
+            )
+        with tracer.span('tag', tokens=len(tokens)):
+            tokens = list(self.tagger(tokens))
+        return tokens
+
+    def check_tokens(self, tokens):
+        tokenizer = self.tokenizer
+        morph = isinstance(tokenizer, MorphTokenizer)
+        tagger = self.tagger
+        tagged = not isinstance(tagger, PassTagger)
+        for token in tokens:
+            if not is_token(token):
+                raise TypeError('expected Token, got {type!r}'.format(
+                    type=type(token)
+                ))
+            if token.type not in tokenizer.types:
+                raise ValueError('token type {type!r} not in {types!r}'.format(
+                    type=token.type,
+                    types=sorted(tokenizer.types)
+                ))
+            if morph and token.type == RUSSIAN and not is_morph_token(token):
+                raise ValueError('expected morph token, got {token!r}'.format(
+                    token=token
+                ))
+            if tagged:
+                if not is_tag_token(token):
+                    raise ValueError('expected tag token, got {token!r}'.format(
+                        token=token
+                    ))
+                if not tagger.check_tag(token.tag):
+                    raise ValueError('unknown tag {tag!r}'.format(
+                        tag=token.tag
+                    ))
+            yield token
+
+    def chart(self, text, all=True, deadline=None):
+        tokens = self.tokenize(text, deadline)
+        return self.build_chart(tokens, text, all, deadline)
+
+    def chart_tokens(self, tokens, text=None, all=True, deadline=None):
+        tokens = self.check_tokens(tokens)
+        return self.build_chart(tokens, text, all, deadline)
+
+    def build_chart(self, tokens, text=None, all=True, deadline=None):
+        if self.metrics:
+            # tokens are lazy, tokenize and morph are measured too
+            with self.metrics.measure() as measure:
+                measure.chart = self.fill_chart(
+                    Chart(tokens, text, deadline),
+                    all
+                )
+            return measure.chart
+        return self.fill_chart(Chart(tokens, text, deadline), all)
+
+    def build_contains(self, tokens, text=None, deadline=None):
+        # Same as build_chart, but stops at first valid match
+        if self.metrics:
+            with self.metrics.measure() as measure:
+                measure.chart = Chart(tokens, text, deadline)
+                found = self.iter_contains(self.iter_chart(measure.chart))
+            return found
+        chart = Chart(tokens, text, deadline)
+        return self.iter_contains(self.iter_chart(chart))
+
+    def fill_chart(self, chart, all=True):
+        if self.tracer:
+            with self.tracer.span('chart') as span:
+                for _ in self.iter_chart(chart, all):
+                    pass
+                span.args.update(
+                    tokens=len(chart.tokens),
+                    states=sum(len(_.states) for _ in chart.columns)
+                )
+        else:
+            for _ in self.iter_chart(chart, all):
+                pass
+        return chart
+
+    def iter_chart(self, chart, all=True):
+        # Yields columns as they are done, all states that stop at column
+        # are there, for queries that stop early
+        barriers = self.barriers or self.terminals is not None
+        released = 0
+        # No match is shorter than min, do not seed where it does not
+        # fit. No state lives longer than max: by Earley prefix property
+        # every state is a prefix of some root match, so indexes of
+        # columns max tokens back are never looked up again
+        min_length, max_length = self.length_bounds
+        last_seed = len(chart.tokens) - min_length
+        starts = None
+        if self.automaton:
+            starts = self.automaton.valid_starts(chart.tokens)
+        limits = self.limits
+        if limits:
+            for column in chart.columns:
+                column.limit(chart, limits)
+        size = 0
+        deadline = chart.deadline
+        chart.profiler = self.profiler
+        chart.tracer = self.tracer
         for column, next_column in chart:
-            if column.first or all:
-                self.predict(column, next_column, self.rule)
+            if (deadline
+                    and not column.index % COLUMNS_STEP
+                    and deadline.check()):
+                chart.expired = True
+                chart.truncate(column.index)
+                return
+            if column.pending is not None:
+                column.admit()
+            if ((column.first or all)
+                    and column.index <= last_seed
+                    and (starts is None or starts[column.index])):
+                self.seed(column, next_column)
+            blocked = (
+                barriers
+                and next_column
+                and self.is_barrier(next_column.token)
+            )
             for state in column:
                 if state.completed:
                     self.complete(column, state)
@@ -268,60 +914,185 @@ class Parser(object):
                     next_term = state.next_term
                     if is_rule(next_term):
                         self.predict(column, next_column, next_term)
-                    elif next_column:
+                        if next_term.empty:
+                            self.skip(column, next_term, state)
+                    elif next_column and not blocked:
                         self.scan(next_column, next_term, state)
-        return chart
+            if blocked:
+                # states never complete past barrier, free indexes
+                for index in range(released, column.index + 1):
+                    chart.columns[index].release()
+                released = column.index + 1
+            elif max_length < INF and column.index >= max_length:
+                chart.columns[column.index - max_length].release()
+            if limits:
+                size += len(column.states)
+                if size > limits.states:
+                    state = column.states[-1]
+                    limits.overflow(chart, 'states', size, column, state.rule)
+                    chart.truncate(column.index + 1)
+                    yield column
+                    return
+            yield column
 
-    def matches(self, text, all=True):
-        chart = self.chart(text, all=all)
-        return (
-            chart
-            if all
-            else chart.last_column
-        ).matches(self.rule)
+    def chart_matches(self, chart, all=True):
+        if all:
+            return chart.matches(self.rule)
+        return whole_matches(chart.last_column.matches(self.rule))
 
-    def extract(self, text, all=True):
-        states = self.matches(text, all=all)
+    def chart_extract(self, chart, all=True, k=None):
+        # k, top k matches best first, else all in chart order
+        states = self.chart_matches(chart, all=all)
         trees = prepare_trees(states)
-        return prepare_matches(trees)
+        if k is not None:
+            trees = best_trees(trees)
+        matches = prepare_matches(
+            trees, chart.text,
+            chart.deadline, chart.profiler, chart.tracer
+        )
+        if k is not None:
+            matches = islice(matches, k)
+        if chart.deadline:
+            matches = iter_released(matches)
+        return matches
 
-    def findall(self, text):
-        states = self.matches(text)
+    def chart_findall(self, chart):
+        states = self.chart_matches(chart)
         trees = prepare_trees(states)
-        trees = sorted(trees)
-        return prepare_resolved_matches(trees)
+        matches = prepare_resolved_matches(
+            trees, chart.text,
+            chart.deadline, chart.profiler, chart.tracer
+        )
+        if chart.deadline:
+            matches = iter_released(matches)
+        if self.metrics:
+            matches = self.metrics.count_matches(matches)
+        return matches
 
-    def find(self, text):
-        for match in self.findall(text):
+    def chart_find(self, chart):
+        for match in self.chart_findall(chart):
+            release_deadline([match])
             return match
 
-    def match(self, text):
-        states = self.matches(text, all=False)
-        trees = prepare_trees(states)
-        trees = sorted(trees)
-        for match in prepare_matches(trees):
+    def chart_match(self, chart):
+        states = self.chart_matches(chart, all=False)
+        trees = best_trees(prepare_trees(states))
+        matches = prepare_matches(
+            trees, chart.text,
+            chart.deadline, chart.profiler, chart.tracer
+        )
+        for match in matches:
+            release_deadline([match])
             return match
 
+    def chart_count(self, chart):
+        states = self.chart_matches(chart)
+        return count_resolved(prepare_trees(states), self.relations)
+
+    def iter_contains(self, columns):
+        for column in columns:
+            for tree in prepare_trees(column.matches(self.rule)):
+                if not self.relations or validate_tree(tree):
+                    return True
+        return False
+
+    # deadline, Deadline checked while tokenizing, building chart and
+    # in Match.fact while query runs, returned matches are released
+
+    def matches(self, text, all=True, deadline=None):
+        chart = self.chart(text, all=all, deadline=deadline)
+        return self.chart_matches(chart, all=all)
+
+    def extract(self, text, all=True, k=None, deadline=None):
+        chart = self.chart(text, all=all, deadline=deadline)
+        return self.chart_extract(chart, all=all, k=k)
+
+    def findall(self, text, deadline=None):
+        return self.chart_findall(self.chart(text, deadline=deadline))
+
+    def find(self, text, deadline=None):
+        return self.chart_find(self.chart(text, deadline=deadline))
+
+    def match(self, text, deadline=None):
+        chart = self.chart(text, all=False, deadline=deadline)
+        return self.chart_match(chart)
+
+    # No Match objects, contains stops at first valid match, count is
+    # len(findall(...))
+
+    def contains(self, text, deadline=None):
+        tokens = self.tokenize(text, deadline)
+        return self.build_contains(tokens, text, deadline)
+
+    def count(self, text, deadline=None):
+        return self.chart_count(self.chart(text, deadline=deadline))
+
+    # Same as above, but tokens are already tokenized, morphed and
+    # tagged, for example to share them between several parsers. text
+    # is optional, used for Match.text
+
+    def matches_tokens(self, tokens, text=None, all=True, deadline=None):
+        chart = self.chart_tokens(tokens, text, all=all, deadline=deadline)
+        return self.chart_matches(chart, all=all)
+
+    def extract_tokens(self, tokens, text=None, all=True, k=None,
+                       deadline=None):
+        chart = self.chart_tokens(tokens, text, all=all, deadline=deadline)
+        return self.chart_extract(chart, all=all, k=k)
+
+    def findall_tokens(self, tokens, text=None, deadline=None):
+        chart = self.chart_tokens(tokens, text, deadline=deadline)
+        return self.chart_findall(chart)
+
+    def find_tokens(self, tokens, text=None, deadline=None):
+        chart = self.chart_tokens(tokens, text, deadline=deadline)
+        return self.chart_find(chart)
+
+    def match_tokens(self, tokens, text=None, deadline=None):
+        chart = self.chart_tokens(tokens, text, all=False, deadline=deadline)
+        return self.chart_match(chart)
+
+    def contains_tokens(self, tokens, text=None, deadline=None):
+        tokens = self.check_tokens(tokens)
+        return self.build_contains(tokens, text, deadline)
+
+    def count_tokens(self, tokens, text=None, deadline=None):
+        chart = self.chart_tokens(tokens, text, deadline=deadline)
+        return self.chart_count(chart)
+
+    def seed(self, column, next_column):
+        self.predict(column, next_column, self.rule)
+
     def predict(self, column, next_column, rule):
-        productions = (
-            rule.predict(next_column.token)
-            if next_column
-            else rule.productions
-        )
-        for index, production in enumerate(productions):
-            node = Node(
-                rule, production,
-                rank=index,
-                children=[]
-            )
-            state = State(
-                rule, production,
-                dot_index=0,
-                start_column=column,
-                stop_column=column,
-                node=node
-            )
-            column.append(state)
+        # Whole closure at once, rules in it are marked predicted, so
+        # states that wait for them do not predict again
+        predicted = column.predicted
+        if id(rule) in predicted:
+            return
+
+        for item in rule.closure:
+            item_id = id(item)
+            if item_id in predicted:
+                continue
+            predicted.add(item_id)
+
+            nodes = item.nodes
+            if nodes is None:
+                productions = (
+                    item.predict(next_column.token)
+                    if next_column
+                    else item.productions
+                )
+                nodes = prepare_nodes(item, productions)
+            for node in nodes:
+                state = State(
+                    item, node.production,
+                    dot_index=0,
+                    start_column=column,
+                    stop_column=column,
+                    node=node
+                )
+                column.append(state)
 
     def scan(self, column, predicate, state):
         token = column.token
@@ -336,7 +1107,22 @@ class Parser(object):
             )
             column.append(state)
 
+    def skip(self, column, rule, state):
+        # Nullable rule, advance over it right away with precomputed
+        # empty node (Aycock, Horspool)
+        state = State(
+            state.rule, state.production,
+            dot_index=state.dot_index + 1,
+            start_column=state.start_column,
+            stop_column=column,
+            node=state.node.attached(rule.empty)
+        )
+        column.append(state)
+
     def complete(self, column, completed):
+        if completed.start_column is column:
+            # empty, parents were advanced by skip
+            return
         for state in completed.parents:
             state = State(
                 state.rule, state.production,
@@ -346,3 +1132,154 @@ class Parser(object):
                 node=state.node.attached(completed.node)
             )
             column.append(state)
+
+
+def roots_length_bounds(roots):
+    min_length, max_length = INF, 0
+    for root in roots:
+        low, high = bnf_length_bounds(root)[id(root)]
+        min_length = min(min_length, low)
+        max_length = max(max_length, high)
+    return LengthBounds(min_length, max_length)
+
+
+class MultiParser(Parser):
+    # Several grammars over one token stream: tokenize and tag once, one
+    # chart, results are lists in the same order as rules
+
+    def __init__(self, rules, tokenizer=None, tagger=None,
+                 barriers=None, infer_barriers=False, automaton=False,
+                 limits=None, tracer=None, metrics=None):
+        rules = list(rules)
+        if not rules:
+            raise ValueError('no rules')
+        context = self.prepare(tokenizer, tagger, limits, tracer, metrics)
+        self.rules = compile_rules(rules, context)
+
+        self.roots = []
+        visited = set()
+        for rule in self.rules:
+            if id(rule) not in visited:
+                visited.add(id(rule))
+                self.roots.append(rule)
+        self.prepare_barriers(context, self.roots, barriers, infer_barriers)
+        self.length_bounds = roots_length_bounds(self.roots)
+        self.relations = has_relations(self.roots)
+        prepare_predictions(self.roots)
+        self.prepare_automaton(self.roots, automaton)
+
+    def seed(self, column, next_column):
+        for rule in self.roots:
+            self.predict(column, next_column, rule)
+
+    def scan(self, column, predicate, state):
+        # same predicate in several grammars/states, check token once
+        scanned = column.scanned
+        key = id(predicate)
+        if key in scanned:
+            token = scanned[key]
+        else:
+            token = column.token
+            token = (
+                predicate.constrain(token)
+                if predicate(token)
+                else None
+            )
+            scanned[key] = token
+
+        if token is not None:
+            leaf = Leaf(predicate, token)
+            state = State(
+                state.rule, state.production,
+                dot_index=state.dot_index + 1,
+                start_column=state.start_column,
+                stop_column=column,
+                node=state.node.attached(leaf)
+            )
+            column.append(state)
+
+    def chart_matches(self, chart, all=True):
+        columns = (
+            chart.columns
+            if all
+            else [chart.last_column]
+        )
+        index = {id(_): [] for _ in self.roots}
+        for column in columns:
+            states = column.states
+            if not all:
+                states = whole_matches(states)
+            for state in states:
+                if state.completed:
+                    items = index.get(id(state.rule))
+                    if items is not None:
+                        items.append(state)
+        return [index[id(_)] for _ in self.rules]
+
+    def chart_extract(self, chart, all=True, k=None):
+        results = []
+        for states in self.chart_matches(chart, all=all):
+            trees = prepare_trees(states)
+            if k is not None:
+                trees = best_trees(trees)
+            matches = prepare_matches(
+                trees, chart.text,
+                chart.deadline, chart.profiler, chart.tracer
+            )
+            if k is not None:
+                matches = islice(matches, k)
+            results.append(release_deadline(list(matches)))
+        return results
+
+    def chart_findall(self, chart):
+        results = [
+            release_deadline(list(prepare_resolved_matches(
+                prepare_trees(_),
+                chart.text,
+                chart.deadline,
+                chart.profiler,
+                chart.tracer
+            )))
+            for _ in self.chart_matches(chart)
+        ]
+        if self.metrics:
+            self.metrics.matched(sum(len(_) for _ in results))
+        return results
+
+    def chart_find(self, chart):
+        return [
+            next(iter(_), None)
+            for _ in self.chart_findall(chart)
+        ]
+
+    def chart_match(self, chart):
+        results = []
+        for states in self.chart_matches(chart, all=False):
+            trees = best_trees(prepare_trees(states))
+            matches = prepare_matches(
+                trees, chart.text,
+                chart.deadline, chart.profiler, chart.tracer
+            )
+            results.append(next(matches, None))
+        return release_deadline(results)
+
+    def chart_count(self, chart):
+        return [
+            count_resolved(prepare_trees(_), self.relations)
+            for _ in self.chart_matches(chart)
+        ]
+
+    def iter_contains(self, columns):
+        # stops when every grammar has a match
+        roots = {id(_) for _ in self.roots}
+        found = set()
+        for column in columns:
+            for state in column:
+                key = id(state.rule)
+                if state.completed and key in roots and key not in found:
+                    tree = Tree(state.node, state.range)
+                    if not self.relations or validate_tree(tree):
+                        found.add(key)
+            if len(found) == len(roots):
+                break
+        return [id(_) in found for _ in self.rules]
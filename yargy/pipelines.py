@@ -40,11 +40,15 @@ class PipelineBNFRule(BNFRule):
         )
 
 
+def is_pipeline_rule(item):
+    return isinstance(item, PipelineBNFRule)
+
+
 class CaselessPipelineBNFRule(PipelineBNFRule):
     abbr = 'caseless_pipeline'
 
     def predict(self, token):
-        value = token.value.lower()
+        value = token.lower
         if value in self.index:
             for production in self.index[value]:
                 yield production
@@ -42,7 +42,9 @@ def int_required(method):
     @wraps(method)
     def wrapper(self, token):
         if token.type == INT:
-            value = int(token.value)
+            value = token.number
+            if value is None:
+                value = int(token.value)
             return method(self, value)
         else:
             return False
@@ -243,7 +245,7 @@ class caseless(ParameterPredicate):
         super(caseless, self).__init__(value.lower())
 
     def __call__(self, token):
-        return token.value.lower() == self.value
+        return token.lower == self.value
 
 
 class in_(ParameterPredicate):
@@ -283,7 +285,7 @@ class in_caseless(ParameterPredicate):
         super(in_caseless, self).__init__(value)
 
     def __call__(self, token):
-        return token.value.lower() in self.value
+        return token.lower in self.value
 
     @property
     def label(self):
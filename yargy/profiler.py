@@ -0,0 +1,258 @@
+
+import json
+from time import perf_counter
+
+from .record import Record
+from .parser import prepare_match
+
+
+RULE_COLUMNS = [
+    'predicted', 'scanned', 'matched', 'completed', 'advanced',
+    'trees', 'invalid', 'discarded', 'matches',
+    'chart_time', 'relations_time', 'interpretation_time'
+]
+PREDICATE_COLUMNS = ['calls', 'matched', 'time']
+
+
+class RuleStats(Record):
+    # predicted, states predicted; scanned/matched, scans of rule states
+    # and successful ones; completed, completed states; advanced, parent
+    # states advanced by them; trees, complete trees in findall;
+    # invalid, trees rejected by relations; discarded, trees that did
+    # not become match: invalid, worse tree of span, overlapped
+    __attributes__ = ['name'] + RULE_COLUMNS
+
+    def __init__(self, name):
+        self.name = name
+        self.predicted = 0
+        self.scanned = 0
+        self.matched = 0
+        self.completed = 0
+        self.advanced = 0
+        self.trees = 0
+        self.invalid = 0
+        self.matches = 0
+        self.chart_time = 0.0
+        self.relations_time = 0.0
+        self.interpretation_time = 0.0
+
+    @property
+    def discarded(self):
+        return max(self.trees - self.matches, 0)
+
+    @property
+    def time(self):
+        return self.chart_time + self.relations_time + self.interpretation_time
+
+
+class PredicateStats(Record):
+    __attributes__ = ['name'] + PREDICATE_COLUMNS
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.matched = 0
+        self.time = 0.0
+
+
+def format_value(value):
+    if isinstance(value, float):
+        return '%.6f' % value
+    return str(value)
+
+
+def format_table(header, rows):
+    rows = [[format_value(_) for _ in row] for row in rows]
+    widths = [
+        max(len(_) for _ in column)
+        for column in zip(header, *rows)
+    ]
+    for row in [header] + rows:
+        yield '  '.join(
+            # names left, numbers right
+            (value.ljust(width) if index == 0 else value.rjust(width))
+            for index, (value, width) in enumerate(zip(row, widths))
+        ).rstrip()
+
+
+class Profiler(object):
+    # Counters and timings per BNF rule and per predicate. Counting
+    # versions of predict, scan and complete are set on parser instance
+    # while profiler is active, parser class is not touched, without
+    # profiler there is no overhead. Not thread safe, parser should not
+    # be shared while profiled
+    #
+    # with parser.profile() as profiler:
+    #     for match in parser.findall(text):
+    #         match.fact
+    # print(profiler.table)
+
+    def __init__(self, parser):
+        self.parser = parser
+        self.rules = {}
+        self.predicates = {}
+
+    def rule(self, rule):
+        key = id(rule)
+        stats = self.rules.get(key)
+        if stats is None:
+            stats = RuleStats(rule.label)
+            self.rules[key] = stats
+        return stats
+
+    def predicate(self, predicate):
+        key = id(predicate)
+        stats = self.predicates.get(key)
+        if stats is None:
+            stats = PredicateStats(predicate.label)
+            self.predicates[key] = stats
+        return stats
+
+    def attach(self):
+        parser = self.parser
+        predict = parser.predict
+        scan = parser.scan
+        complete = parser.complete
+
+        def profiled_predict(column, next_column, rule):
+            size = len(column.states)
+            start = perf_counter()
+            predict(column, next_column, rule)
+            self.rule(rule).chart_time += perf_counter() - start
+            for state in column.states[size:]:
+                self.rule(state.rule).predicted += 1
+
+        def profiled_scan(column, predicate, state):
+            # predicate is called once more to time it alone
+            stats = self.rule(state.rule)
+            start = perf_counter()
+            matched = bool(predicate(column.token))
+            duration = perf_counter() - start
+            predicate_stats = self.predicate(predicate)
+            predicate_stats.calls += 1
+            predicate_stats.matched += matched
+            predicate_stats.time += duration
+            stats.scanned += 1
+            stats.matched += matched
+
+            start = perf_counter()
+            scan(column, predicate, state)
+            stats.chart_time += perf_counter() - start
+
+        def profiled_complete(column, completed):
+            size = len(column.states)
+            start = perf_counter()
+            complete(column, completed)
+            stats = self.rule(completed.rule)
+            stats.chart_time += perf_counter() - start
+            stats.completed += 1
+            stats.advanced += len(column.states) - size
+
+        parser.predict = profiled_predict
+        parser.scan = profiled_scan
+        parser.complete = profiled_complete
+        parser.profiler = self
+
+    def detach(self):
+        for key in ['predict', 'scan', 'complete', 'profiler']:
+            self.parser.__dict__.pop(key, None)
+
+    def __enter__(self):
+        self.attach()
+        return self
+
+    def __exit__(self, *args):
+        self.detach()
+
+    def prepare_match(self, tree, document=None, deadline=None):
+        stats = self.rule(tree.root.rule)
+        start = perf_counter()
+        match = prepare_match(tree, document, deadline)
+        stats.relations_time += perf_counter() - start
+        if match is None:
+            stats.invalid += 1
+        else:
+            match.profiler = self
+        return match
+
+    def trees(self, trees):
+        for tree in trees:
+            self.rule(tree.root.rule).trees += 1
+
+    def resolved(self, match):
+        self.rule(match.rule).matches += 1
+
+    def interpreted(self, rule, duration):
+        self.rule(rule).interpretation_time += duration
+
+    def reset(self):
+        self.rules = {}
+        self.predicates = {}
+
+    @property
+    def rule_rows(self):
+        # slowest first
+        return sorted(
+            self.rules.values(),
+            key=lambda _: _.time,
+            reverse=True
+        )
+
+    @property
+    def predicate_rows(self):
+        return sorted(
+            self.predicates.values(),
+            key=lambda _: _.time,
+            reverse=True
+        )
+
+    @property
+    def as_json(self):
+        return {
+            'rules': [
+                dict(
+                    [('name', _.name)]
+                    + [(key, getattr(_, key)) for key in RULE_COLUMNS]
+                )
+                for _ in self.rule_rows
+            ],
+            'predicates': [
+                dict(
+                    [('name', _.name)]
+                    + [(key, getattr(_, key)) for key in PREDICATE_COLUMNS]
+                )
+                for _ in self.predicate_rows
+            ]
+        }
+
+    def dumps(self, **kwargs):
+        return json.dumps(self.as_json, ensure_ascii=False, **kwargs)
+
+    @property
+    def source(self):
+        for line in format_table(
+                ['rule'] + RULE_COLUMNS,
+                [
+                    [_.name] + [getattr(_, key) for key in RULE_COLUMNS]
+                    for _ in self.rule_rows
+                ]
+        ):
+            yield line
+        yield ''
+        for line in format_table(
+                ['predicate'] + PREDICATE_COLUMNS,
+                [
+                    [_.name] + [getattr(_, key) for key in PREDICATE_COLUMNS]
+                    for _ in self.predicate_rows
+                ]
+        ):
+            yield line
+
+    @property
+    def table(self):
+        return '\n'.join(self.source)
+
+    def _repr_pretty_(self, printer, cycle):
+        for line in self.source:
+            printer.text(line)
+            printer.break_()
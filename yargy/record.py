@@ -2,6 +2,7 @@
 
 class Record(object):
     __attributes__ = []
+    __slots__ = ()
 
     def __eq__(self, other):
         return (
@@ -1,4 +1,6 @@
 
+from collections import deque
+
 from yargy.record import Record
 
 from .transformators import (
@@ -12,6 +14,9 @@ from .constructors import (
 )
 
 
+INF = float('inf')
+
+
 def generate_names(rules):
     count = 0
     for rule in rules:
@@ -21,6 +26,18 @@ def generate_names(rules):
         yield rule
 
 
+class LengthBounds(Record):
+    __attributes__ = ['min', 'max']
+
+    def __init__(self, min, max):
+        self.min = min
+        self.max = max
+
+    @property
+    def bounded(self):
+        return self.max < INF
+
+
 class BNF(Record):
     __attributes__ = ['rules']
 
@@ -31,6 +48,17 @@ class BNF(Record):
     def start(self):
         return self.rules[0]
 
+    @property
+    def length_bounds(self):
+        start = self.start
+        bounds = bnf_length_bounds(start)
+        return LengthBounds(*bounds[id(start)])
+
+    @property
+    def unbounded(self):
+        # Recursive rules, they make max length INF
+        return list(bnf_recursive(self.start))
+
     @property
     def source(self):
         for rule in self.rules:
@@ -55,6 +83,14 @@ class BNFRule(Rule):
     def as_bnf(self):
         return BNF(self.walk(types=BNFRule))
 
+    @property
+    def length_bounds(self):
+        return self.as_bnf.length_bounds
+
+    @property
+    def unbounded(self):
+        return self.as_bnf.unbounded
+
     def predict(self, _):
         return self.productions
 
@@ -92,12 +128,21 @@ class BNFTransformator(RuleTransformator):
         self.parents = {}
 
     def __call__(self, root):
+        # Single walk to count parents and collect forwards, instead of
+        # separate walk in RuleTransformator.__call__
+        forwards = []
+        parents = self.parents
         for item in root.walk():
+            if is_forward_rule(item):
+                forwards.append(item)
             for child in item.children:
                 child_id = id(child)
-                count = self.parents.get(child_id, 0)
-                self.parents[child_id] = count + 1
-        return super(BNFTransformator, self).__call__(root)
+                parents[child_id] = parents.get(child_id, 0) + 1
+
+        for item in forwards:
+            if item.rule:
+                item.define(self.visit(item.rule))
+        return self.visit(root)
 
     def is_shared(self, item):
         return self.parents[id(item)] > 1
@@ -168,3 +213,125 @@ class RemoveForwardTransformator(InplaceRuleTransformator):
 
     def visit_PipelineBNFRule(self, item):
         return item
+
+
+def bnf_children(rule):
+    for production in rule.productions:
+        for term in production.terms:
+            if is_rule(term):
+                yield term
+
+
+def bnf_closure(rule):
+    # rule and rules predicted through first terms, breadth first, same
+    # order chart loop would predict them
+    queue = deque([rule])
+    visited = {id(rule)}
+    while queue:
+        item = queue.popleft()
+        yield item
+        for production in item.productions:
+            terms = production.terms
+            if terms and is_rule(terms[0]) and id(terms[0]) not in visited:
+                visited.add(id(terms[0]))
+                queue.append(terms[0])
+
+
+def bnf_terminals(root):
+    visited = set()
+    for rule in root.walk(types=BNFRule):
+        for production in rule.productions:
+            for term in production.terms:
+                if not is_rule(term) and id(term) not in visited:
+                    visited.add(id(term))
+                    yield term
+
+
+def bnf_components(root):
+    # Tarjan strongly connected components, iterative, grammars from
+    # max_bound etc are too deep for recursion. Yields components in
+    # reverse topological order, children first
+    indexes = {}
+    lowlinks = {}
+    stack = []
+    on_stack = set()
+    counter = 0
+    frames = [(root, iter(bnf_children(root)))]
+    indexes[id(root)] = lowlinks[id(root)] = counter
+    stack.append(root)
+    on_stack.add(id(root))
+    while frames:
+        rule, children = frames[-1]
+        for child in children:
+            child_id = id(child)
+            if child_id not in indexes:
+                counter += 1
+                indexes[child_id] = lowlinks[child_id] = counter
+                stack.append(child)
+                on_stack.add(child_id)
+                frames.append((child, iter(bnf_children(child))))
+                break
+            elif child_id in on_stack:
+                lowlinks[id(rule)] = min(lowlinks[id(rule)], indexes[child_id])
+        else:
+            frames.pop()
+            rule_id = id(rule)
+            if frames:
+                parent_id = id(frames[-1][0])
+                lowlinks[parent_id] = min(lowlinks[parent_id], lowlinks[rule_id])
+            if lowlinks[rule_id] == indexes[rule_id]:
+                component = []
+                while True:
+                    item = stack.pop()
+                    on_stack.discard(id(item))
+                    component.append(item)
+                    if item is rule:
+                        break
+                yield component
+
+
+def is_recursive(component):
+    if len(component) > 1:
+        return True
+    rule = component[0]
+    return any(_ is rule for _ in bnf_children(rule))
+
+
+def bnf_recursive(root):
+    for component in bnf_components(root):
+        if is_recursive(component):
+            for rule in component:
+                yield rule
+
+
+def bnf_length_bounds(root):
+    # id(rule) -> (min, max) tokens. Recursion gives max INF, even if
+    # recursive production is nullable, safe side. min is INF for rules
+    # that match nothing
+    bounds = {}
+
+    def term_bounds(term):
+        if is_rule(term):
+            return bounds.get(id(term), (INF, INF))
+        return 1, 1
+
+    for component in bnf_components(root):
+        recursive = is_recursive(component)
+        for rule in component:
+            bounds[id(rule)] = (INF, INF if recursive else 0)
+
+        changed = True
+        while changed:
+            changed = False
+            for rule in component:
+                low, high = INF, 0
+                for production in rule.productions:
+                    items = [term_bounds(_) for _ in production.terms]
+                    low = min(low, sum(min_ for min_, _ in items))
+                    high = max(high, sum(max_ for _, max_ in items))
+                if recursive:
+                    high = INF
+                if (low, high) != bounds[id(rule)]:
+                    bounds[id(rule)] = low, high
+                    changed = True
+    return bounds
@@ -1,4 +1,6 @@
 
+from collections import deque
+
 from yargy.record import Record
 from yargy.check import (
     assert_type,
@@ -103,16 +105,14 @@ class Rule(Record):
     def normalized(self):
         from .transformators import (
             SquashExtendedTransformator,
-            ReplaceOrTransformator,
-            ReplaceEmptyTransformator,
+            ReplaceOrEmptyTransformator,
             ReplaceExtendedTransformator,
             FlattenTransformator
         )
         return self.transform(
             SquashExtendedTransformator,
             ReplaceExtendedTransformator,
-            ReplaceOrTransformator,
-            ReplaceEmptyTransformator,
+            ReplaceOrEmptyTransformator,
             FlattenTransformator,
         )
 
@@ -132,6 +132,14 @@ class Rule(Record):
             RemoveForwardTransformator,
         ).as_bnf
 
+    @property
+    def length_bounds(self):
+        return self.normalized.as_bnf.length_bounds
+
+    @property
+    def unbounded(self):
+        return self.normalized.as_bnf.unbounded
+
     def walk(self, types=None):
         items = bfs_rule(self)
         if types:
@@ -144,10 +152,10 @@ def is_rule(item):
 
 
 def bfs_rule(rule):
-    queue = [rule]
+    queue = deque([rule])
     visited = {id(rule)}
     while queue:
-        item = queue.pop(0)
+        item = queue.popleft()
         yield item
         for child in item.children:
             if id(child) not in visited:
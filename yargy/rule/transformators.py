@@ -305,6 +305,13 @@ class ReplaceEmptyTransformator(RuleTransformator):
         return Rule([EmptyProduction()])
 
 
+class ReplaceOrEmptyTransformator(
+        ReplaceOrTransformator,
+        ReplaceEmptyTransformator):
+    # Both replacements in one pass over the grammar
+    pass
+
+
 def max_bound(item, count, reverse=False):
     from yargy.api import rule, or_
 
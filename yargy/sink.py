@@ -0,0 +1,168 @@
+
+import json
+import pickle
+from io import BytesIO
+
+from .interpretation.fact import Fact
+
+
+BATCH_SIZE = 1000
+
+
+def dumps(value):
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def format_json(value):
+    # Same layout as Fact.as_json, but streamed as str chunks straight
+    # from the normalized fact, no intermediate OrderedDict tree
+    if isinstance(value, Fact):
+        yield '{'
+        first = True
+        for key in value.__attributes__:
+            item = getattr(value, key)
+            if item is None:
+                continue
+            if not first:
+                yield ','
+            first = False
+            yield dumps(key)
+            yield ':'
+            for chunk in format_json(item):
+                yield chunk
+        yield '}'
+    elif isinstance(value, (list, tuple)):
+        yield '['
+        for index, item in enumerate(value):
+            if index > 0:
+                yield ','
+            for chunk in format_json(item):
+                yield chunk
+        yield ']'
+    else:
+        yield dumps(value)
+
+
+def has_fact(match):
+    return match.tree.root.interpretator is not None
+
+
+def format_match(match, id=None):
+    yield '{'
+    if id is not None:
+        yield '"id":'
+        yield dumps(id)
+        yield ','
+    start, stop = match.span
+    yield '"span":[%d,%d],"rule":' % (start, stop)
+    yield dumps(match.rule.label)
+    if has_fact(match):
+        yield ',"fact":'
+        for chunk in format_json(match.fact):
+            yield chunk
+    yield '}'
+
+
+def fact_tuple(value):
+    if isinstance(value, Fact):
+        return (
+            value.__class__.__name__,
+            tuple(
+                fact_tuple(getattr(value, _))
+                for _ in value.__attributes__
+            )
+        )
+    elif isinstance(value, (list, tuple)):
+        return [fact_tuple(_) for _ in value]
+    else:
+        return value
+
+
+def match_tuple(match, id=None):
+    fact = None
+    if has_fact(match):
+        fact = fact_tuple(match.fact)
+    start, stop = match.span
+    return id, start, stop, match.rule.label, fact
+
+
+class Sink(object):
+    def __init__(self, file, batch_size=BATCH_SIZE):
+        self.file = file
+        self.batch_size = batch_size
+        self.buffer = []
+        self.size = 0
+
+    def write(self, match, id=None):
+        raise NotImplementedError
+
+    def write_all(self, matches, id=None):
+        for match in matches:
+            self.write(match, id=id)
+
+    def flush(self):
+        raise NotImplementedError
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+class JSONLSink(Sink):
+    def write(self, match, id=None):
+        buffer = self.buffer
+        buffer.extend(format_match(match, id=id))
+        buffer.append('\n')
+        self.size += 1
+        if self.size >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.file.write(''.join(self.buffer))
+        self.buffer = []
+        self.size = 0
+
+
+class BinarySink(Sink):
+    # Stream of pickled plain tuples (id, start, stop, rule, fact), fact
+    # is (name, values) or plain value, see load_binary
+
+    def __init__(self, file, batch_size=BATCH_SIZE):
+        super(BinarySink, self).__init__(file, batch_size)
+        self.reset()
+
+    def reset(self):
+        self.buffer = BytesIO()
+        self.pickler = pickle.Pickler(
+            self.buffer,
+            protocol=pickle.HIGHEST_PROTOCOL
+        )
+        self.size = 0
+
+    def write(self, match, id=None):
+        self.pickler.dump(match_tuple(match, id=id))
+        # do not keep references to already written records
+        self.pickler.clear_memo()
+        self.size += 1
+        if self.size >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.size:
+            self.file.write(self.buffer.getvalue())
+        self.reset()
+
+
+def load_binary(file):
+    unpickler = pickle.Unpickler(file)
+    while True:
+        try:
+            yield unpickler.load()
+        except EOFError:
+            break
@@ -0,0 +1,126 @@
+
+import sys
+import copy
+import pickle
+import struct
+
+from .interpretation.fact import (
+    Fact,
+    fact
+)
+from .interpretation.attribute import (
+    AttributeScheme,
+    RepeatableAttribute
+)
+
+
+MAGIC = b'YARGY'
+VERSION = 1
+HEADER = struct.Struct('>5sH')
+
+MORPH = 'morph'
+NORMALIZER_CACHE = 'normalizer_cache'
+
+
+def is_importable(item):
+    module = sys.modules.get(item.__module__)
+    return getattr(module, item.__qualname__, None) is item
+
+
+def fact_schemes(cls):
+    for key in cls.__attributes__:
+        attribute = getattr(cls, key)
+        if isinstance(attribute, RepeatableAttribute):
+            yield AttributeScheme(key).repeatable()
+        else:
+            yield AttributeScheme(key, attribute.default)
+
+
+def restore_fact(name, schemes, module):
+    cls = fact(name, schemes)
+    cls.__module__ = module
+    return cls
+
+
+class SnapshotPickler(pickle.Pickler):
+    # Functions, predicates, taggers are stored by reference, pickle
+    # default. Exceptions: morph analyzer (pymorphy2 dicts, is passed
+    # to load), shared normalizer cache (loaded parser uses module
+    # CACHE), fact classes not reachable by module path (by value)
+
+    def persistent_id(self, item):
+        from .morph import MorphAnalyzer
+        from .interpretation.normalizer import CACHE
+
+        if isinstance(item, MorphAnalyzer):
+            return MORPH
+        if item is CACHE:
+            return NORMALIZER_CACHE
+
+    def reducer_override(self, item):
+        if (isinstance(item, type)
+                and issubclass(item, Fact)
+                and item is not Fact
+                and not is_importable(item)):
+            schemes = list(fact_schemes(item))
+            return restore_fact, (item.__name__, schemes, item.__module__)
+        return NotImplemented
+
+
+class SnapshotUnpickler(pickle.Unpickler):
+    def __init__(self, file, morph=None):
+        super(SnapshotUnpickler, self).__init__(file)
+        self.morph = morph
+
+    def persistent_load(self, id):
+        if id == NORMALIZER_CACHE:
+            from .interpretation.normalizer import CACHE
+            return CACHE
+        if id != MORPH:
+            raise pickle.UnpicklingError(id)
+        if self.morph is None:
+            from .morph import CachedMorphAnalyzer
+            self.morph = CachedMorphAnalyzer()
+        return self.morph
+
+
+def strip_runtime(parser):
+    # Limits, tracer, metrics, profiler are not stored, metrics of
+    # loaded parser would go to private copy of registry
+    parser = copy.copy(parser)
+    parser.prepare_runtime()
+    parser.profiler = None
+    return parser
+
+
+def dump(parser, file):
+    file.write(HEADER.pack(MAGIC, VERSION))
+    pickler = SnapshotPickler(file, protocol=pickle.HIGHEST_PROTOCOL)
+    pickler.dump(strip_runtime(parser))
+
+
+def load(file, morph=None, limits=None, tracer=None, metrics=None):
+    data = file.read(HEADER.size)
+    if len(data) < HEADER.size:
+        raise ValueError('not a yargy snapshot')
+    magic, version = HEADER.unpack(data)
+    if magic != MAGIC:
+        raise ValueError('not a yargy snapshot')
+    if version != VERSION:
+        raise ValueError('snapshot version {got}, expected {expected}'.format(
+            got=version,
+            expected=VERSION
+        ))
+    parser = SnapshotUnpickler(file, morph).load()
+    parser.prepare_runtime(limits, tracer, metrics)
+    return parser
+
+
+def save_parser(parser, path):
+    with open(path, 'wb') as file:
+        dump(parser, file)
+
+
+def load_parser(path, morph=None, limits=None, tracer=None, metrics=None):
+    with open(path, 'rb') as file:
+        return load(file, morph, limits, tracer, metrics)
@@ -4,6 +4,7 @@ from yargy.record import Record
 
 class Span(Record):
     __attributes__ = ['start', 'stop']
+    __slots__ = ['start', 'stop']
 
     def __init__(self, start, stop):
         self.start = start
@@ -5,26 +5,37 @@ from .span import Span
 
 class Token(Record):
     __attributes__ = ['value', 'span', 'type']
+    # All slots live in base class, MorphTagToken inherits both
+    # MorphToken and TagToken, they can not both have nonempty slots.
+    # lower and number are computed once: predicates call them per
+    # state, tokenizer passes interned values
+    __slots__ = ['value', 'span', 'type', 'forms', 'tag', 'lower', 'number']
 
-    def __init__(self, value, span, type):
+    def __init__(self, value, span, type, lower=None, number=None):
         self.value = value
         self.span = span
         self.type = type
+        if lower is None:
+            lower = value.lower()
+        self.lower = lower
+        self.number = number
 
     @property
     def normalized(self):
-        return self.value.lower()
+        return self.lower
 
     def morphed(self, forms):
         return MorphToken(
             self.value, self.span, self.type,
-            forms
+            forms,
+            self.lower, self.number
         )
 
     def tagged(self, tag):
         return TagToken(
             self.value, self.span, self.type,
-            tag
+            tag,
+            self.lower, self.number
         )
 
 
@@ -34,9 +45,10 @@ def is_token(item):
 
 class MorphToken(Token):
     __attributes__ = ['value', 'span', 'type', 'forms']
+    __slots__ = ()
 
-    def __init__(self, value, span, type, forms):
-        Token.__init__(self, value, span, type)
+    def __init__(self, value, span, type, forms, lower=None, number=None):
+        Token.__init__(self, value, span, type, lower, number)
         self.forms = forms
 
     @property
@@ -47,13 +59,15 @@ class MorphToken(Token):
     def tagged(self, tag):
         return MorphTagToken(
             self.value, self.span, self.type,
-            tag, self.forms
+            tag, self.forms,
+            self.lower, self.number
         )
 
     def constrained(self, forms):
         return MorphToken(
             self.value, self.span, self.type,
-            forms
+            forms,
+            self.lower, self.number
         )
 
 
@@ -63,9 +77,10 @@ def is_morph_token(item):
 
 class TagToken(Token):
     __attributes__ = ['value', 'span', 'type', 'tag']
+    __slots__ = ()
 
-    def __init__(self, value, span, type, tag):
-        Token.__init__(self, value, span, type)
+    def __init__(self, value, span, type, tag, lower=None, number=None):
+        Token.__init__(self, value, span, type, lower, number)
         self.tag = tag
 
 
@@ -75,33 +90,44 @@ def is_tag_token(item):
 
 class MorphTagToken(MorphToken, TagToken):
     __attributes__ = ['value', 'span', 'type', 'tag', 'forms']
+    __slots__ = ()
 
-    def __init__(self, value, span, type, tag, forms):
-        Token.__init__(self, value, span, type)
+    def __init__(self, value, span, type, tag, forms, lower=None, number=None):
+        Token.__init__(self, value, span, type, lower, number)
         self.tag = tag
         self.forms = forms
 
     def constrained(self, forms):
         return MorphTagToken(
             self.value, self.span, self.type,
-            self.tag, forms
+            self.tag, forms,
+            self.lower, self.number
         )
 
 
-def format_tokens(tokens):
+def format_tokens(tokens, values):
     previous = None
-    for token in tokens:
+    for token, value in zip(tokens, values):
         if previous:
             _, stop = previous.span
             start, _ = token.span
             if start - stop > 0:
                 yield ' '
         previous = token
-        yield token.value
+        yield value
+
+
+def join_values(tokens, values):
+    # Values are passed aside so no intermediate Token per value
+    return ''.join(format_tokens(tokens, values))
 
 
 def join_tokens(tokens):
-    return ''.join(format_tokens(tokens))
+    tokens = list(tokens)
+    return join_values(
+        tokens,
+        [_.value for _ in tokens]
+    )
 
 
 def normalize_token(token):
@@ -113,32 +139,107 @@ def normalize_token(token):
 
 
 def join_normalized_tokens(tokens):
-    return join_tokens(
-        normalize_token(_)
-        for _ in tokens
+    tokens = list(tokens)
+    return join_values(
+        tokens,
+        [_.normalized for _ in tokens]
     )
 
 
-def inflect_token(token, grams):
+def grams_key(grams):
+    if grams:
+        return frozenset(grams)
+
+
+def form_key(form):
+    return form.raw.tag, form.normalized
+
+
+def inflect_form(form, grams, cache=None):
+    if cache is None:
+        return form.inflect(grams)
+
+    key = form_key(form), grams_key(grams)
+    value = cache.get(key)
+    if value is None:
+        value = form.inflect(grams)
+        cache.set(key, value)
+    return value
+
+
+def inflect_value(token, grams, cache=None):
     if is_morph_token(token):
         form = token.forms[0]
-        value = form.inflect(grams)
+        return inflect_form(form, grams, cache)
     else:
-        value = token.normalized
+        return token.normalized
+
+
+def inflect_token(token, grams, cache=None):
     return Token(
-        value,
+        inflect_value(token, grams, cache),
         token.span,
         token.type
     )
 
 
-def join_inflected_tokens(tokens, grams):
-    return join_tokens(
-        inflect_token(_, grams)
-        for _ in tokens
+def join_inflected_tokens(tokens, grams, cache=None):
+    tokens = list(tokens)
+    return join_values(
+        tokens,
+        [inflect_value(_, grams, cache) for _ in tokens]
+    )
+
+
+def token_key(token):
+    if is_morph_token(token):
+        return form_key(token.forms[0])
+    return token.normalized
+
+
+def forms_key(forms):
+    # Form.raw is None for forms built by hand, key by normalized and
+    # grams
+    return tuple(
+        (_.normalized, frozenset(_.grams.values))
+        for _ in forms
     )
 
 
+def predicate_key(token):
+    # Predicates look at value, type, forms and tag. Forms of same value
+    # differ for pre-tokenized input with disambiguated forms, so they
+    # are part of key
+    forms = None
+    if is_morph_token(token):
+        forms = forms_key(token.forms)
+    tag = None
+    if is_tag_token(token):
+        tag = token.tag
+    return token.type, token.value, forms, tag
+
+
+def tokens_key(tokens):
+    # Everything normalized and inflected chains depend on: first
+    # form of every token and whether tokens are separated by space
+    key = []
+    previous = None
+    for token in tokens:
+        if previous:
+            key.append(token.span.start > previous.span.stop)
+        key.append(token_key(token))
+        previous = token
+    return tuple(key)
+
+
 def get_tokens_span(tokens):
     head, tail = tokens[0], tokens[-1]
     return Span(head.span.start, tail.span.stop)
+
+
+def tokens_text(tokens, text):
+    # Original substring with whitespace, unlike join_tokens
+    if not tokens:
+        return ''
+    start, stop = get_tokens_span(tokens)
+    return text[start:stop]
@@ -1,10 +1,13 @@
 
 import re
+import threading
+from time import perf_counter
 
 from .record import Record
 from .check import assert_type
 from .span import Span
 from .token import Token
+from .cache import CACHE_SIZE
 
 
 class TokenRule(Record):
@@ -59,6 +62,12 @@ class Tokenizer(object):
             assert_type(rule, TokenRule)
         self.rules = rules
         self.regexp, self.mapping, self.types = self.compile(rules)
+        self.interned = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['interned'] = {}
+        return state
 
     def add_rules(self, *rules):
         self.reset(list(rules) + self.rules)
@@ -95,18 +104,53 @@ class Tokenizer(object):
         regexp = re.compile(pattern, re.UNICODE | re.IGNORECASE)
         return regexp, mapping, types
 
+    def intern(self, type, value):
+        # Same words, numbers, punct repeat a lot: share str objects,
+        # lower and parse INT once per value
+        interned = self.interned
+        if len(interned) >= CACHE_SIZE:
+            interned.clear()
+        number = None
+        if type == INT:
+            try:
+                number = int(value)
+            except ValueError:
+                pass
+        item = type, value, value.lower(), number
+        interned[value] = item
+        return item
+
     def __call__(self, text):
-        for match in re.finditer(self.regexp, text):
-            name = match.lastgroup
-            value = match.group(0)
+        mapping = self.mapping
+        interned = self.interned
+        for match in self.regexp.finditer(text):
+            type = mapping[match.lastgroup]
+            value = match.group()
+            item = interned.get(value)
+            if item is None or item[0] != type:
+                item = self.intern(type, value)
+            type, value, lower, number = item
             start, stop = match.span()
-            type = self.mapping[name]
-            token = Token(value, Span(start, stop), type)
-            yield token
+            yield Token(value, Span(start, stop), type, lower, number)
 
     def split(self, text):
         return [_.value for _ in self(text)]
 
+    def buffer(self, text):
+        from .buffer import TokenBuffer
+        return TokenBuffer(self(text))
+
+
+class MorphTimer(object):
+    # Time spent in morph analyzer while tokenizer runs, for tracer.
+    # Set per thread in TIMER.morph, tokenizer may be shared
+    def __init__(self):
+        self.seconds = 0
+        self.calls = 0
+
+
+TIMER = threading.local()
+
 
 class MorphTokenizer(Tokenizer):
     def __init__(self, rules=RULES, morph=None):
@@ -118,9 +162,29 @@ class MorphTokenizer(Tokenizer):
 
     def __call__(self, text):
         tokens = Tokenizer.__call__(self, text)
+        return self.morph_tokens(tokens)
+
+    def morph_tokens(self, tokens):
+        timer = getattr(TIMER, 'morph', None)
+        if timer is not None:
+            return self.timed_morph_tokens(tokens, timer)
+        return self.plain_morph_tokens(tokens)
+
+    def plain_morph_tokens(self, tokens):
+        for token in tokens:
+            if token.type == RUSSIAN:
+                forms = self.morph(token.value)
+                yield token.morphed(forms)
+            else:
+                yield token
+
+    def timed_morph_tokens(self, tokens, timer):
         for token in tokens:
             if token.type == RUSSIAN:
+                start = perf_counter()
                 forms = self.morph(token.value)
+                timer.seconds += perf_counter() - start
+                timer.calls += 1
                 yield token.morphed(forms)
             else:
                 yield token
@@ -0,0 +1,105 @@
+
+import os
+import json
+import threading
+from time import perf_counter
+
+from .record import Record
+
+
+class TraceEvent(Record):
+    # start and duration in seconds, perf_counter() clock, args are
+    # sizes: tokens, states, trees, matches
+    __attributes__ = ['name', 'start', 'duration', 'args']
+
+    def __init__(self, name, start, duration, args=None, thread=None):
+        self.name = name
+        self.start = start
+        self.duration = duration
+        self.args = args or {}
+        self.thread = thread
+
+    @property
+    def as_chrome(self):
+        # Complete event, chrome://tracing, Perfetto, times in us
+        return {
+            'name': self.name,
+            'ph': 'X',
+            'ts': self.start * 1000000,
+            'dur': self.duration * 1000000,
+            'pid': os.getpid(),
+            'tid': self.thread,
+            'args': self.args
+        }
+
+
+class TraceSpan(object):
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start = None
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        duration = perf_counter() - self.start
+        self.tracer.add(self.name, self.start, duration, **self.args)
+
+
+class Tracer(object):
+    # Stage timings per document: tokenize, morph (analyzer calls inside
+    # tokenize), tag, chart, relations (per tree), resolve, interpret
+    # (per Match.fact). Parser(...,
+    # tracer=Tracer()). callback is called with every TraceEvent, with
+    # keep=False events are not stored, for example to stream them
+    #
+    # tracer = Tracer()
+    # parser = Parser(RULE, tracer=tracer)
+    # parser.findall(text)
+    # tracer.dump('trace.json')  # chrome://tracing, ui.perfetto.dev
+
+    def __init__(self, callback=None, keep=True):
+        self.callback = callback
+        self.keep = keep
+        self.events = []
+
+    def span(self, name, **args):
+        # args can be updated inside with block, sizes known at the end
+        return TraceSpan(self, name, args)
+
+    def add(self, name, start, duration, **args):
+        event = TraceEvent(
+            name, start, duration, args,
+            thread=threading.get_ident()
+        )
+        if self.keep:
+            self.events.append(event)
+        if self.callback:
+            self.callback(event)
+        return event
+
+    def reset(self):
+        self.events = []
+
+    @property
+    def as_chrome(self):
+        return {
+            'traceEvents': [_.as_chrome for _ in self.events],
+            'displayTimeUnit': 'ms'
+        }
+
+    def dumps(self):
+        return json.dumps(self.as_chrome, ensure_ascii=False)
+
+    def dump(self, path):
+        with open(path, 'w') as file:
+            json.dump(self.as_chrome, file, ensure_ascii=False)
+
+    def __getstate__(self):
+        # collected events stay in this process
+        state = self.__dict__.copy()
+        state['events'] = []
+        return state
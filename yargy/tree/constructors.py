@@ -1,4 +1,6 @@
 
+from collections import deque
+
 from yargy.record import Record
 from yargy.visitor import TransformatorsComposition
 
@@ -34,15 +36,13 @@ class Tree(Record):
         transform = ApplyRelationsTransformator(relations)
         return transform(self)
 
-    def interpret(self):
+    def interpret(self, document=None):
         from .transformators import (
             KeepInterpretationNodesTransformator,
             InterpretationTransformator
         )
-        return self.transform(
-            KeepInterpretationNodesTransformator,
-            InterpretationTransformator
-        )
+        tree = KeepInterpretationNodesTransformator()(self)
+        return InterpretationTransformator(document)(tree)
 
     @property
     def as_dot(self):
@@ -63,9 +63,9 @@ class Tree(Record):
 
 
 def bfs_tree(root):
-    queue = [root]
+    queue = deque([root])
     while queue:
-        item = queue.pop(0)
+        item = queue.popleft()
         yield item
         queue.extend(item.children)
 
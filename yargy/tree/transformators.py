@@ -90,11 +90,17 @@ class KeepInterpretationNodesTransformator(TreeTransformator):
 
 
 class InterpretationTransformator(TreeTransformator):
+    def __init__(self, document=None):
+        self.document = document
+
     def __call__(self, tree):
         return self.visit(tree.root)
 
     def visit_Node(self, item):
-        input = InterpretatorInput(self.visit(_) for _ in item.children)
+        input = InterpretatorInput(
+            (self.visit(_) for _ in item.children),
+            document=self.document
+        )
         if isinstance(item.production, PipelineProduction):
             input.key = item.production.value
         return item.interpretator(input)
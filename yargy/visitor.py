@@ -2,17 +2,28 @@
 from .check import assert_subclass
 
 
+# (visitor class, item class) -> method name, MRO walk once per pair
+METHODS = {}
+
+
 class Visitor(object):
-    def resolve_method(self, item):
+    def resolve_method_name(self, item):
         for cls in item.__class__.__mro__:
             name = 'visit_' + cls.__name__
-            method = getattr(self, name, None)
-            if method:
-                return method
+            if getattr(self, name, None):
+                return name
         raise ValueError('no method for {type!r}'.format(
             type=type(item)
         ))
 
+    def resolve_method(self, item):
+        key = self.__class__, item.__class__
+        name = METHODS.get(key)
+        if name is None:
+            name = self.resolve_method_name(item)
+            METHODS[key] = name
+        return getattr(self, name)
+
     def visit(self, item):
         return self.resolve_method(item)(item)
 